@@ -0,0 +1,123 @@
+from typing import NamedTuple, Callable, Dict, List, Sequence, Set
+
+from cegarpy.atom import Atom
+from cegarpy.formula import Formula, Literal, Clause, ConjunctiveClause, Implication, Box, Dia, BoxChain
+from cegarpy.tableau import ModalTableau
+
+# Scalable K families in the spirit of the LWB benchmarks, stated directly in BoxChain normal form.
+# Every family has a satisfiable ("_p") and an unsatisfiable ("_n") variant whose answer is known by construction.
+
+
+class Problem(NamedTuple):
+    family: str
+    size: int
+    classic_formulae: ConjunctiveClause
+    modal_formulae: BoxChain
+    expected: bool
+
+    @property
+    def name(self) -> str:
+        return f"{self.family}_{'p' if self.expected else 'n'}"
+
+    def tableau(self) -> ModalTableau:
+        return ModalTableau(self.classic_formulae, self.modal_formulae)
+
+
+def _lit(symbol: str, sign: bool = True) -> Literal:
+    return Literal(Atom(symbol), sign)
+
+
+def _clause(*lits: Literal) -> Clause:
+    return Clause(frozenset(lits))
+
+
+def _implies(guard: Literal, *lits: Literal) -> Implication:
+    return Implication(guard, _clause(*lits))
+
+
+def _problem(family: str, size: int, classic_formulae: Set[Formula], levels: Sequence[Set[Formula]],
+             expected: bool) -> Problem:
+    return Problem(family, size, ConjunctiveClause(frozenset(classic_formulae)),
+                   BoxChain(tuple(ConjunctiveClause(frozenset(level)) for level in levels)), expected)
+
+
+def branching(size: int, satisfiable: bool) -> Problem:
+    # Every world at depth i < size branches on p_i while all earlier choices persist: 2^size leaves.
+    levels: List[Set[Formula]] = []
+    guards = [_lit('r')]
+    for i in range(size):
+        level: Set[Formula] = set()
+        for guard in guards:
+            level.add(Implication(guard, Dia(_lit(f"p{i}"))))
+            level.add(Implication(guard, Dia(_lit(f"p{i}", False))))
+        for j in range(i):
+            level.add(Implication(_lit(f"p{j}"), Box(_lit(f"p{j}"))))
+            level.add(Implication(_lit(f"p{j}", False), Box(_lit(f"p{j}", False))))
+        levels.append(level)
+        guards = [_lit(f"p{i}"), _lit(f"p{i}", False)]
+    if not satisfiable:
+        levels.append({_implies(_lit(f"p{size - 1}"), _lit(f"p{size - 1}", False))})
+    return _problem('branching', size, {_lit('r')}, levels, satisfiable)
+
+
+def path(size: int, satisfiable: bool) -> Problem:
+    # A single chain of length size along which q has to persist.
+    levels: List[Set[Formula]] = []
+    for i in range(size):
+        level: Set[Formula] = {Implication(_lit(f"d{i}"), Dia(_lit(f"d{i + 1}"))),
+                               Implication(_lit('q'), Box(_lit('q')))}
+        levels.append(level)
+    levels.append({_implies(_lit(f"d{size}"), _lit('q', satisfiable))})
+    return _problem('path', size, {_lit('d0'), _lit('q')}, levels, satisfiable)
+
+
+def d4(size: int, satisfiable: bool) -> Problem:
+    # A chain of length size where each world also has a side successor and size atoms persist along all edges.
+    levels: List[Set[Formula]] = []
+    for i in range(size):
+        level: Set[Formula] = {Implication(_lit(f"d{i}"), Dia(_lit(f"d{i + 1}"))),
+                               Implication(_lit(f"d{i}"), Dia(_lit(f"e{i + 1}")))}
+        level.update(Implication(_lit(f"a{j}"), Box(_lit(f"a{j}"))) for j in range(size))
+        levels.append(level)
+    if satisfiable:
+        levels.append({_implies(_lit(f"d{size}"), *(_lit(f"a{j}") for j in range(size)))})
+    else:
+        levels.append({_implies(_lit(f"d{size}"), *(_lit(f"a{j}", False) for j in range(size)))})
+    return _problem('d4', size, {_lit('d0')} | {_lit(f"a{j}") for j in range(size)}, levels, satisfiable)
+
+
+def poly(size: int, satisfiable: bool) -> Problem:
+    # At each of size depths one of size options has to be picked; all but the first one block the successor,
+    # so the tableau has to learn its way through the options (the "_n" variant blocks the first one at the end).
+    def options(i: int) -> Clause:
+        return _clause(*(_lit(f"c{i}_{k}") for k in range(size)))
+
+    levels: List[Set[Formula]] = []
+    for i in range(size):
+        first = 0 if not satisfiable and i == size - 1 else 1
+        level: Set[Formula] = {Implication(_lit(f"g{i}"), Dia(_lit(f"g{i + 1}")))}
+        level.update(Implication(_lit(f"c{i}_{k}"), Box(_lit(f"g{i + 1}", False))) for k in range(first, size))
+        if i > 0:
+            level.add(Implication(_lit(f"g{i}"), options(i)))
+        levels.append(level)
+    return _problem('poly', size, {_lit('g0'), options(0)}, levels, satisfiable)
+
+
+FAMILIES: Dict[str, Callable[[int, bool], Problem]] = {
+    'branching': branching,
+    'path': path,
+    'd4': d4,
+    'poly': poly,
+}
+
+SIZES: Dict[str, Sequence[int]] = {
+    'branching': (2, 4, 6, 8),
+    'path': (4, 16, 64),
+    'd4': (2, 4, 8),
+    'poly': (2, 4, 8),
+}
+
+
+def problems(families: Sequence[str] = tuple(FAMILIES), sizes: Sequence[int] = ()) -> List[Problem]:
+    return [FAMILIES[family](size, satisfiable) for family in families for size in (sizes or SIZES[family])
+            for satisfiable in (True, False)]
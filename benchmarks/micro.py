@@ -0,0 +1,194 @@
+import argparse
+import gc
+import json
+import statistics
+import sys
+import timeit
+import tracemalloc
+from typing import NamedTuple, Callable, Any, List, Dict, Optional, Sequence
+
+from frozendict import frozendict
+
+from cegarpy.atom import Atom
+from cegarpy.formula import Formula, Literal, Implication, Box, Clause, Conjunction, ConjunctiveClause, \
+    FrozenValuation, all_valuations
+
+# Each case builds its inputs in setup(size) and returns the operation to measure, so only the operation is timed.
+
+
+class Case(NamedTuple):
+    name: str
+    size: int
+    setup: Callable[[int], Callable[[], Any]]
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{self.size}]"
+
+
+def _atoms(size: int) -> List[Atom]:
+    return [Atom(f"x{i}") for i in range(size)]
+
+
+def _lits(size: int) -> List[Literal]:
+    return [Literal(atom, i % 2 == 0) for i, atom in enumerate(_atoms(size))]
+
+
+def _valuation(size: int) -> FrozenValuation:
+    return FrozenValuation(frozendict({atom: i % 3 == 0 for i, atom in enumerate(_atoms(size))}))
+
+
+def _nested(size: int) -> Formula:
+    formula: Formula = Literal(Atom('x0'))
+    for i in range(1, size):
+        formula = Conjunction(formula, Literal(Atom(f"x{i}"), i % 2 == 0))
+    return formula
+
+
+def _construct_literal(size: int) -> Callable[[], Any]:
+    atoms = _atoms(size)
+    return lambda: [Literal(atom, False) for atom in atoms]
+
+
+def _construct_implication(size: int) -> Callable[[], Any]:
+    lits = _lits(size)
+    return lambda: [Implication(lit, Box(lit)) for lit in lits]
+
+
+def _hash_frozenset(size: int) -> Callable[[], Any]:
+    lits = _lits(size)
+    return lambda: frozenset(lits)
+
+
+def _hash_clause(size: int) -> Callable[[], Any]:
+    formulae = frozenset(_lits(size))
+    return lambda: hash(Clause(formulae))
+
+
+def _evaluate_clause(size: int) -> Callable[[], Any]:
+    clause = ConjunctiveClause(frozenset(Clause(frozenset({lit, -lit})) for lit in _lits(size)))
+    valuation = _valuation(size)
+    return lambda: clause.evaluate(valuation)
+
+
+def _evaluate_nested(size: int) -> Callable[[], Any]:
+    formula = _nested(size)
+    valuation = _valuation(size)
+    return lambda: formula.evaluate(valuation)
+
+
+def _atoms_clause(size: int) -> Callable[[], Any]:
+    clause = Clause(frozenset(_lits(size)))
+    return lambda: clause.atoms
+
+
+def _atoms_nested(size: int) -> Callable[[], Any]:
+    formula = _nested(size)
+    return lambda: formula.atoms
+
+
+def _valuation_eq(size: int) -> Callable[[], Any]:
+    left = _valuation(size)
+    right = FrozenValuation(frozendict(dict(left.mapping)))
+    return lambda: left == right
+
+
+def _valuation_le(size: int) -> Callable[[], Any]:
+    smaller = FrozenValuation(frozendict(dict(list(_valuation(size).mapping.items())[:size // 2])))
+    larger = _valuation(size)
+    return lambda: smaller <= larger
+
+
+def _all_valuations(size: int) -> Callable[[], Any]:
+    clause = Clause(frozenset(_lits(size)))
+    return lambda: list(all_valuations(clause))
+
+
+CASES: List[Case] = [
+    *(Case('literal', size, _construct_literal) for size in (1, 64)),
+    *(Case('implication', size, _construct_implication) for size in (1, 64)),
+    *(Case('frozenset', size, _hash_frozenset) for size in (4, 64)),
+    *(Case('clause_hash', size, _hash_clause) for size in (4, 64)),
+    *(Case('evaluate_clause', size, _evaluate_clause) for size in (4, 64)),
+    *(Case('evaluate_nested', size, _evaluate_nested) for size in (4, 64)),
+    *(Case('atoms_clause', size, _atoms_clause) for size in (4, 64)),
+    *(Case('atoms_nested', size, _atoms_nested) for size in (4, 64)),
+    *(Case('valuation_eq', size, _valuation_eq) for size in (4, 64)),
+    *(Case('valuation_le', size, _valuation_le) for size in (4, 64)),
+    *(Case('all_valuations', size, _all_valuations) for size in (4, 8)),
+]
+
+
+def allocations(operation: Callable[[], Any], number: int) -> Dict[str, float]:
+    results: List[Any] = [None] * number
+    operation()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        for index in range(number):
+            results[index] = operation()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    differences = after.compare_to(before, 'filename')
+    return {
+        'blocks': sum(difference.count_diff for difference in differences) / number,
+        'bytes': sum(difference.size_diff for difference in differences) / number,
+        'peak_bytes': peak - current,
+    }
+
+
+def measure(case: Case, repeat: int = 5, allocation_runs: int = 100) -> Dict[str, Any]:
+    operation = case.setup(case.size)
+    timer = timeit.Timer(operation)
+    number, _ = timer.autorange()
+    timings = [seconds / number for seconds in timer.repeat(repeat, number)]
+    return {
+        'case': case.key,
+        'number': number,
+        'ns': min(timings) * 1e9,
+        'median_ns': statistics.median(timings) * 1e9,
+        **allocations(operation, allocation_runs),
+    }
+
+
+def run(cases: Sequence[Case], repeat: int = 5) -> List[Dict[str, Any]]:
+    return [measure(case, repeat) for case in cases]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.micro', description="Micro-benchmark formula.py")
+    parser.add_argument('filter', nargs='*', help="only run cases whose name contains one of these substrings")
+    parser.add_argument('--repeat', type=int, default=5, help="timing repetitions, the fastest is reported")
+    parser.add_argument('--output', help="write the results as JSON to this file")
+    parser.add_argument('--baseline', help="show the speed-up relative to results written with --output")
+    arguments = parser.parse_args(argv)
+
+    cases = [case for case in CASES if not arguments.filter or any(part in case.key for part in arguments.filter)]
+    baseline: Dict[str, Dict[str, Any]] = {}
+    if arguments.baseline:
+        with open(arguments.baseline, encoding='utf-8') as file:
+            baseline = {result['case']: result for result in json.load(file)}
+    results = []
+    print(f"{'case':>20} {'ns/op':>12} {'median':>12} {'blocks/op':>10} {'bytes/op':>10} {'peak':>8}")
+    for case in cases:
+        result = measure(case, arguments.repeat)
+        results.append(result)
+        line = f"{result['case']:>20} {result['ns']:>12.1f} {result['median_ns']:>12.1f} {result['blocks']:>10.1f} " \
+               f"{result['bytes']:>10.1f} {result['peak_bytes']:>8}"
+        if result['case'] in baseline:
+            line += f" {baseline[result['case']]['ns'] / result['ns']:>6.2f}x"
+        print(line)
+    if arguments.output:
+        with open(arguments.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+import argparse
+import dataclasses
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+from benchmarks.families import Problem, FAMILIES, problems
+
+
+def measure(problem: Problem, repeat: int = 5) -> Dict[str, Any]:
+    timings: List[float] = []
+    result: Optional[bool] = None
+    counters: Dict[str, int] = {}
+    for _ in range(repeat):
+        tableau = problem.tableau()
+        start = time.perf_counter()
+        result = tableau.solve()
+        timings.append(time.perf_counter() - start)
+        counters = dataclasses.asdict(tableau.statistics)
+    tracemalloc.start()
+    try:
+        problem.tableau().solve()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'name': problem.name,
+        'size': problem.size,
+        'expected': problem.expected,
+        'result': result,
+        'seconds': min(timings),
+        'median_seconds': statistics.median(timings),
+        'peak_bytes': peak,
+        'statistics': counters,
+    }
+
+
+def run(families: Sequence[str], sizes: Sequence[int] = (), repeat: int = 5) -> Dict[str, Any]:
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': [measure(problem, repeat) for problem in problems(families, sizes)],
+    }
+
+
+def _key(result: Dict[str, Any]) -> Tuple[str, int]:
+    return result['name'], result['size']
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.25,
+            noise: float = 0.001) -> List[str]:
+    reference = {_key(result): result for result in baseline['results']}
+    regressions: List[str] = []
+    for result in current['results']:
+        old = reference.get(_key(result))
+        if old is None:
+            continue
+        if result['seconds'] > old['seconds'] * (1 + threshold) and result['seconds'] - old['seconds'] > noise:
+            regressions.append(f"{result['name']}[{result['size']}]: {old['seconds']:.4f}s -> "
+                               f"{result['seconds']:.4f}s")
+        if result['peak_bytes'] > old['peak_bytes'] * (1 + threshold):
+            regressions.append(f"{result['name']}[{result['size']}]: peak {old['peak_bytes']} -> "
+                               f"{result['peak_bytes']} bytes")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run', description="Benchmark ModalTableau.solve()")
+    parser.add_argument('--family', action='append', choices=sorted(FAMILIES), help="family to run (repeatable)")
+    parser.add_argument('--size', action='append', type=int, help="override the default sizes (repeatable)")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per problem, the fastest is reported")
+    parser.add_argument('--output', help="write the results as JSON to this file")
+    parser.add_argument('--baseline', help="compare against results previously written with --output")
+    parser.add_argument('--threshold', type=float, default=0.25, help="tolerated relative slowdown")
+    arguments = parser.parse_args(argv)
+
+    current = run(arguments.family or sorted(FAMILIES), arguments.size or (), arguments.repeat)
+    failures = 0
+    for result in current['results']:
+        status = 'ok' if result['result'] == result['expected'] else 'WRONG'
+        failures += status != 'ok'
+        print(f"{result['name']:>12} {result['size']:>4} {result['seconds'] * 1000:>10.2f}ms "
+              f"{result['peak_bytes'] / 1024:>10.1f}KiB {status}")
+    if arguments.output:
+        with open(arguments.output, 'w', encoding='utf-8') as file:
+            json.dump(current, file, indent=2)
+    if arguments.baseline:
+        with open(arguments.baseline, encoding='utf-8') as file:
+            regressions = compare(current, json.load(file), arguments.threshold)
+        for regression in regressions:
+            print(f"regression: {regression}")
+        failures += len(regressions)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,322 @@
+import re
+from typing import Dict, List, Tuple, Optional, Sequence, Mapping, Callable, FrozenSet, Union
+
+from frozendict import frozendict
+
+from cegarpy.atom import Atom
+from cegarpy.formula import Formula, Valuation, FrozenValuation, MutableValuation, AtomicFormula, Literal, Bot, Top, \
+    Negation, Conjunction, Disjunction, Implication, Equivalence, Clause, ConjunctiveClause, Box, Dia, BoxChain
+from cegarpy.solver import DpllSolver
+
+FALSE: int = 0
+TRUE: int = 1
+
+_TERMINAL_LEVEL: int = 1 << 62
+
+_OPERATIONS: Dict[str, Callable[[bool, bool], bool]] = {
+    'and': lambda a, b: a and b,
+    'or': lambda a, b: a or b,
+    'xor': lambda a, b: a != b,
+    'iff': lambda a, b: a == b,
+    'implies': lambda a, b: (not a) or b,
+}
+_COMMUTATIVE: FrozenSet[str] = frozenset({'and', 'or', 'xor', 'iff'})
+
+
+class BddOverflow(RuntimeError):
+    pass
+
+
+def _natural(atom: Atom) -> Tuple[Tuple[int, Union[int, str]], ...]:
+    return tuple((0, int(part)) if part.isdigit() else (1, part) for part in re.split(r'(\d+)', atom.symbol))
+
+
+class Bdd:
+
+    def __init__(self, order: Sequence[Atom] = (), cache_size: int = 1 << 16,
+                 max_nodes: Optional[int] = None) -> None:
+        self.order: List[Atom] = []
+        self.levels: Dict[Atom, int] = {}
+        self.nodes: List[Tuple[int, int, int]] = [(_TERMINAL_LEVEL, FALSE, FALSE), (_TERMINAL_LEVEL, TRUE, TRUE)]
+        self.unique: Dict[Tuple[int, int, int], int] = {}
+        self.cache: Dict[Tuple[str, int, int], int] = {}
+        self.cache_size: int = cache_size
+        self.max_nodes: Optional[int] = max_nodes
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
+        for atom in order:
+            self.declare(atom)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def declare(self, atom: Atom) -> int:
+        if atom not in self.levels:
+            self.levels[atom] = len(self.order)
+            self.order.append(atom)
+        return self.levels[atom]
+
+    def level(self, node: int) -> int:
+        return self.nodes[node][0]
+
+    def mk(self, level: int, low: int, high: int) -> int:
+        if low == high:
+            return low
+        key = (level, low, high)
+        node = self.unique.get(key)
+        if node is None:
+            node = len(self.nodes)
+            if self.max_nodes is not None and node >= self.max_nodes:
+                raise BddOverflow(f"BDD exceeds {self.max_nodes} nodes")
+            self.nodes.append(key)
+            self.unique[key] = node
+        return node
+
+    def var(self, atom: Atom) -> int:
+        return self.mk(self.declare(atom), FALSE, TRUE)
+
+    def _cached(self, key: Tuple[str, int, int]) -> Optional[int]:
+        result = self.cache.get(key)
+        if result is None:
+            self.cache_misses += 1
+        else:
+            self.cache_hits += 1
+        return result
+
+    def _store(self, key: Tuple[str, int, int], result: int) -> int:
+        if len(self.cache) >= self.cache_size:
+            del self.cache[next(iter(self.cache))]
+        self.cache[key] = result
+        return result
+
+    def negate(self, u: int) -> int:
+        return self.apply('xor', u, TRUE)
+
+    @staticmethod
+    def _shortcut(operation: str, u: int, v: int) -> Optional[int]:
+        if u <= TRUE and v <= TRUE:
+            return TRUE if _OPERATIONS[operation](u == TRUE, v == TRUE) else FALSE
+        if operation == 'and':
+            if u == FALSE or v == FALSE:
+                return FALSE
+            if u == TRUE or u == v:
+                return v
+            if v == TRUE:
+                return u
+        elif operation == 'or':
+            if u == TRUE or v == TRUE:
+                return TRUE
+            if u == FALSE or u == v:
+                return v
+            if v == FALSE:
+                return u
+        return None
+
+    def _cofactors(self, u: int, v: int) -> Tuple[int, Tuple[int, int], Tuple[int, int]]:
+        u_level, u_low, u_high = self.nodes[u]
+        v_level, v_low, v_high = self.nodes[v]
+        level = min(u_level, v_level)
+        if u_level != level:
+            u_low = u_high = u
+        if v_level != level:
+            v_low = v_high = v
+        return level, (u_low, v_low), (u_high, v_high)
+
+    def apply(self, operation: str, u: int, v: int) -> int:
+        # Iterative, so the depth is not bounded by the recursion limit: a pair is pushed again (expanded) below its
+        # cofactor pairs and combined once both of them are done.
+        done: Dict[Tuple[int, int], int] = {}
+        pending: List[Tuple[int, int, bool]] = [(u, v, False)]
+        while pending:
+            a, b, expanded = pending.pop()
+            key = (operation, b, a) if operation in _COMMUTATIVE and a > b else (operation, a, b)
+            if expanded:
+                level, low, high = self._cofactors(a, b)
+                done[a, b] = self._store(key, self.mk(level, done[low], done[high]))
+                continue
+            if (a, b) in done:
+                continue
+            result = self._shortcut(operation, a, b)
+            if result is None:
+                result = self._cached(key)
+            if result is not None:
+                done[a, b] = result
+                continue
+            _, low, high = self._cofactors(a, b)
+            pending.append((a, b, True))
+            pending.append((*high, False))
+            pending.append((*low, False))
+        return done[u, v]
+
+    def compile(self, formula: Formula) -> int:
+        # New atoms are ordered by their symbols (numbers compared as numbers) rather than in the hash-dependent order
+        # in which the frozensets of the formula yield them.
+        for atom in sorted(formula.atoms - self.levels.keys(), key=_natural):
+            self.declare(atom)
+        return self._compile(formula)
+
+    def _compile(self, formula: Formula) -> int:
+        if isinstance(formula, (Literal, AtomicFormula)):
+            node = self.var(formula.atom)
+            return self.negate(node) if isinstance(formula, Literal) and not formula.sign else node
+        if isinstance(formula, Top):
+            return TRUE
+        if isinstance(formula, Bot):
+            return FALSE
+        if isinstance(formula, Negation):
+            return self.negate(self._compile(formula.formula))
+        if isinstance(formula, (Conjunction, ConjunctiveClause)):
+            return self._fold('and', TRUE, formula)
+        if isinstance(formula, (Disjunction, Clause)):
+            return self._fold('or', FALSE, formula)
+        if isinstance(formula, Implication):
+            return self.apply('implies', self._compile(formula.left), self._compile(formula.right))
+        if isinstance(formula, Equivalence):
+            return self.apply('iff', self._compile(formula.left), self._compile(formula.right))
+        if isinstance(formula, (Box, Dia, BoxChain)):
+            raise TypeError(f"{type(formula).__name__} Formulae cannot be compiled to a BDD")
+        raise TypeError(f"Cannot compile Formula of type {type(formula).__name__}")
+
+    def _fold(self, operation: str, neutral: int, formula: Formula) -> int:
+        result = neutral
+        operands = sorted((self._compile(isf) for isf in formula.immediate_subformulae), key=self.level, reverse=True)
+        for operand in operands:
+            result = self.apply(operation, result, operand)
+        return result
+
+    def restrict(self, u: int, assignment: Mapping[Atom, bool]) -> int:
+        fixed = {self.levels[atom]: value for atom, value in assignment.items() if atom in self.levels}
+        if not fixed:
+            return u
+        memo: Dict[int, int] = {FALSE: FALSE, TRUE: TRUE}
+        pending = [u]
+        while pending:
+            node = pending[-1]
+            if node in memo:
+                pending.pop()
+                continue
+            level, low, high = self.nodes[node]
+            children = ((high if fixed[level] else low),) if level in fixed else (low, high)
+            missing = [child for child in children if child not in memo]
+            if missing:
+                pending.extend(missing)
+                continue
+            pending.pop()
+            memo[node] = memo[children[0]] if level in fixed else self.mk(level, memo[low], memo[high])
+        return memo[u]
+
+    def pick(self, u: int) -> Optional[Dict[Atom, bool]]:
+        if u == FALSE:
+            return None
+        path: Dict[Atom, bool] = {}
+        while u != TRUE:
+            level, low, high = self.nodes[u]
+            if low != FALSE:
+                path[self.order[level]] = False
+                u = low
+            else:
+                path[self.order[level]] = True
+                u = high
+        return path
+
+    def support(self, u: int) -> FrozenSet[Atom]:
+        levels = set()
+        seen = set()
+        pending = [u]
+        while pending:
+            node = pending.pop()
+            if node <= TRUE or node in seen:
+                continue
+            seen.add(node)
+            level, low, high = self.nodes[node]
+            levels.add(level)
+            pending.extend((low, high))
+        return frozenset(self.order[level] for level in levels)
+
+    def count(self, u: int, alphabet: Sequence[Atom]) -> int:
+        absent = self.support(u) - set(alphabet)
+        if absent:
+            raise ValueError(f"Alphabet is missing {', '.join(sorted(str(atom) for atom in absent))}")
+        levels = sorted(self.declare(atom) for atom in set(alphabet))
+        rank = {level: index for index, level in enumerate(levels)}
+        memo: Dict[int, int] = {FALSE: FALSE, TRUE: TRUE}
+
+        def rank_(node: int) -> int:
+            return len(levels) if node <= TRUE else rank[self.level(node)]
+
+        pending = [u]
+        while pending:
+            node = pending[-1]
+            if node in memo:
+                pending.pop()
+                continue
+            _, low, high = self.nodes[node]
+            missing = [child for child in (low, high) if child not in memo]
+            if missing:
+                pending.extend(missing)
+                continue
+            pending.pop()
+            memo[node] = (memo[low] << (rank_(low) - rank_(node) - 1)) + (memo[high] << (rank_(high) - rank_(node) - 1))
+        return memo[u] << rank_(u)
+
+
+class BddSolver:
+
+    def __init__(self, order: Sequence[Atom] = (), cache_size: int = 1 << 16, max_nodes: int = 1 << 18,
+                 max_compiled: int = 1024) -> None:
+        self.cache_size: int = cache_size
+        self.max_nodes: int = max_nodes
+        self.max_compiled: int = max_compiled
+        self.bdd: Bdd = Bdd(order, cache_size, max_nodes)
+        self.compiled: Dict[ConjunctiveClause, int] = {}
+        self.fallback: DpllSolver = DpllSolver()
+        self.fallbacks: int = 0
+        self._model: Optional[Valuation] = None
+        self._core: Optional[FrozenSet[Literal]] = None
+
+    def reset(self) -> None:
+        # Nodes are never freed individually, so the whole table is dropped (keeping the variable order).
+        self.bdd = Bdd(self.bdd.order, self.cache_size, self.max_nodes)
+        self.compiled = {}
+
+    def solve(self, clauses: ConjunctiveClause) -> bool:
+        return self.solve_under_assumptions(clauses, MutableValuation())
+
+    def solve_under_assumptions(self, clauses: ConjunctiveClause, assumptions: Valuation) -> bool:
+        for _ in range(2):
+            try:
+                return self._query(clauses, assumptions)
+            except BddOverflow:
+                self.reset()
+        # The problem alone does not fit into max_nodes in this order, so it is handed to the DPLL solver.
+        self.fallbacks += 1
+        result = self.fallback.solve_under_assumptions(clauses, assumptions)
+        self._model = self.fallback.model()
+        self._core = self.fallback.core()
+        return result
+
+    def _query(self, clauses: ConjunctiveClause, assumptions: Valuation) -> bool:
+        node = self.compiled.get(clauses)
+        if node is None:
+            if len(self.compiled) >= self.max_compiled:
+                del self.compiled[next(iter(self.compiled))]
+            node = self.bdd.compile(clauses)
+            self.compiled[clauses] = node
+        fixed = {atom: assumptions.assignment(atom) for atom in assumptions.alphabet}
+        path = self.bdd.pick(self.bdd.restrict(node, fixed))
+        if path is None:
+            self._model = None
+            atoms = clauses.atoms
+            self._core = frozenset(Literal(atom, value) for atom, value in fixed.items() if atom in atoms)
+            return False
+        mapping = {atom: True for atom, value in path.items() if value}
+        mapping.update(fixed)
+        self._model = FrozenValuation(frozendict(mapping))
+        self._core = None
+        return True
+
+    def model(self) -> Optional[Valuation]:
+        return self._model
+
+    def core(self) -> Optional[FrozenSet[Literal]]:
+        return self._core
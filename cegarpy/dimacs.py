@@ -0,0 +1,158 @@
+import io
+import queue
+import subprocess
+import threading
+import time
+from typing import Sequence, Optional, List, Tuple, Iterable, Iterator, IO
+
+from cegarpy.sat import CnfEncoding
+from cegarpy.solver import EncodingSolver
+
+# DimacsSolver talks to a local solver executable in one of two modes:
+#   one-shot (default): every query starts the executable, writes plain DIMACS with the assumptions as unit clauses,
+#       closes stdin and reads "s ..." / "v ..." lines until EOF. Any SAT-competition style solver works.
+#   incremental (opt-in): one process answers many queries on the same pipe in the following dialect, which standard
+#       solvers do not speak (cegarpy.stub_solver does):
+#           request:  "p cnf <variables> <clauses>", the clauses, then "a <assumptions> 0"
+#           response: "s SATISFIABLE" followed by "v <model> 0", or
+#                     "s UNSATISFIABLE" followed by "f <failed assumptions> 0"
+#       A handshake query is sent when the process starts, so an executable that waits for EOF fails with an error
+#       after handshake_timeout seconds instead of blocking.
+
+
+def write_dimacs(stream: IO[str], num_variables: int, clauses: Sequence[Sequence[int]]) -> None:
+    stream.write(f"p cnf {num_variables} {len(clauses)}\n")
+    stream.writelines(f"{' '.join(map(str, clause))} 0\n" for clause in clauses)
+
+
+def read_dimacs(lines: Iterable[str]) -> Iterator[Tuple[str, List[int]]]:
+    pending: List[int] = []
+    for line in lines:
+        tokens = line.split()
+        if not tokens or tokens[0] == 'c':
+            continue
+        if tokens[0] in ('p', 's'):
+            yield tokens[0], [int(token) for token in tokens[2:] if token.lstrip('-').isdigit()]
+            continue
+        if tokens[0] in ('a', 'v', 'f'):
+            yield tokens[0], [int(token) for token in tokens[1:] if token != '0']
+            continue
+        for token in tokens:
+            lit = int(token)
+            if lit == 0:
+                yield 'clause', pending
+                pending = []
+            else:
+                pending.append(lit)
+
+
+def _status(line: str) -> bool:
+    if line.startswith('s SATISFIABLE'):
+        return True
+    if line.startswith('s UNSATISFIABLE'):
+        return False
+    raise RuntimeError(f"Unexpected solver status line {line.strip()!r}")
+
+
+class DimacsSolver(EncodingSolver):
+
+    def __init__(self, command: Sequence[str], incremental: bool = False, timeout: Optional[float] = None,
+                 handshake_timeout: float = 5.0, max_encodings: int = 1024) -> None:
+        super().__init__(max_encodings)
+        self.command: List[str] = list(command)
+        self.incremental: bool = incremental
+        self.timeout: Optional[float] = timeout
+        self.handshake_timeout: float = handshake_timeout
+        self._process: Optional[subprocess.Popen] = None
+        self._lines: 'queue.Queue[Optional[str]]' = queue.Queue()
+
+    def __enter__(self) -> 'DimacsSolver':
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._process is not None:
+            assert self._process.stdin is not None
+            try:
+                self._process.stdin.close()
+                self._process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self._process.kill()
+                self._process.wait()
+            if self._process.stdout is not None:
+                self._process.stdout.close()
+            self._process = None
+
+    def _search(self, encoding: CnfEncoding, lits: List[int]) -> Tuple[bool, List[int]]:
+        if self.incremental:
+            return self._query_process(encoding.num_variables, encoding.clauses, lits)
+        return self._query_once(encoding, lits)
+
+    def _query_once(self, encoding: CnfEncoding, lits: List[int]) -> Tuple[bool, List[int]]:
+        stream = io.StringIO()
+        write_dimacs(stream, encoding.num_variables, encoding.clauses + [(lit,) for lit in lits])
+        try:
+            completed = subprocess.run(self.command, input=stream.getvalue(), stdout=subprocess.PIPE, text=True,
+                                       timeout=self.timeout, check=False)
+        except subprocess.TimeoutExpired as error:
+            raise TimeoutError(f"Solver {self.command[0]!r} did not answer within {self.timeout}s") from error
+        output = completed.stdout.splitlines()
+        status = next((line for line in output if line.startswith('s ')), None)
+        if status is None:
+            raise RuntimeError(f"Solver {self.command[0]!r} reported no status")
+        if not _status(status):
+            return False, lits
+        return True, [lit for kind, values in read_dimacs(output) if kind == 'v' for lit in values]
+
+    def _start(self) -> None:
+        self._process = subprocess.Popen(self.command, stdin=subprocess.PIPE,  # pylint: disable=consider-using-with
+                                         stdout=subprocess.PIPE, text=True, bufsize=1)
+        self._lines = queue.Queue()
+        threading.Thread(target=_pump, args=(self._process.stdout, self._lines), daemon=True).start()
+        try:
+            satisfiable, values = self._exchange(1, [(1,)], [], self.handshake_timeout)
+        except (TimeoutError, RuntimeError, OSError) as error:
+            self.close()
+            raise RuntimeError(f"Solver {self.command[0]!r} does not speak the incremental dialect; "
+                               f"use incremental=False for one-shot DIMACS solvers") from error
+        if not satisfiable or values != [1]:
+            self.close()
+            raise RuntimeError(f"Solver {self.command[0]!r} failed the incremental handshake")
+
+    def _query_process(self, num_variables: int, clauses: Sequence[Sequence[int]],
+                       lits: List[int]) -> Tuple[bool, List[int]]:
+        if self._process is None or self._process.poll() is not None:
+            self._start()
+        try:
+            return self._exchange(num_variables, clauses, lits, self.timeout)
+        except TimeoutError:
+            self.close()
+            raise
+
+    def _exchange(self, num_variables: int, clauses: Sequence[Sequence[int]], lits: List[int],
+                  timeout: Optional[float]) -> Tuple[bool, List[int]]:
+        assert self._process is not None and self._process.stdin is not None
+        write_dimacs(self._process.stdin, num_variables, clauses)
+        self._process.stdin.write(f"a {' '.join(map(str, lits + [0]))}\n")
+        self._process.stdin.flush()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        status: Optional[bool] = None
+        while True:
+            try:
+                line = self._lines.get(timeout=None if deadline is None else max(deadline - time.monotonic(), 0))
+            except queue.Empty as error:
+                raise TimeoutError(f"Solver {self.command[0]!r} did not answer within {timeout}s") from error
+            if line is None:
+                raise RuntimeError(f"Solver {self.command[0]!r} terminated before answering")
+            if line.startswith('s '):
+                status = _status(line)
+            elif line[:1] in ('v', 'f') and status is not None:
+                return status, [int(token) for token in line.split()[1:] if token != '0']
+
+
+def _pump(stream: IO[str], lines: 'queue.Queue[Optional[str]]') -> None:
+    for line in stream:
+        lines.put(line)
+    lines.put(None)
@@ -149,11 +149,12 @@ def all_valuations(formula: Formula,
     if alphabet is None:
         alphabet = formula.atoms
     if valuation is None:
-        free_atoms = alphabet
-    else:
-        free_atoms = alphabet - set(valuation.alphabet)
+        yield from (FrozenValuation.from_atoms(true_atoms) for true_atoms in more_itertools.powerset(alphabet))
+        return
+    fixed = {atom: valuation.assignment(atom) for atom in valuation.alphabet}
+    free_atoms = alphabet - fixed.keys()
     for true_atoms in more_itertools.powerset(free_atoms):
-        yield FrozenValuation.from_atoms(true_atoms)
+        yield FrozenValuation(frozendict({**fixed, **{atom: True for atom in true_atoms}}))
 
 
 def models(formula: Formula,
@@ -241,7 +242,7 @@ class Top(Formula):
         return '⊤'
 
     def evaluate(self, valuation: Optional[Valuation] = None) -> bool:
-        return False
+        return True
 
 
 @dataclass(frozen=True, eq=True)
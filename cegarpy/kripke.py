@@ -0,0 +1,166 @@
+from typing import Sequence, Dict, List, Tuple, Iterable, Optional, Any
+
+import numpy as np
+import numpy.typing as npt
+from frozendict import frozendict
+
+from cegarpy.atom import Atom
+from cegarpy.formula import Formula, Valuation, FrozenValuation, AtomicFormula, Literal, Bot, Top, Negation, \
+    Conjunction, Disjunction, Implication, Equivalence, Clause, ConjunctiveClause, Box, Dia, BoxChain
+from cegarpy.tableau import ModalTableau
+from cegarpy.witness import WitnessNode
+
+BoolArray = npt.NDArray[np.bool_]
+IndexArray = npt.NDArray[np.int64]
+
+
+class KripkeStructure:
+
+    def __init__(self, atoms: Sequence[Atom], valuations: npt.ArrayLike, indptr: npt.ArrayLike,
+                 indices: npt.ArrayLike) -> None:
+        self.atoms: Tuple[Atom, ...] = tuple(atoms)
+        self.columns: Dict[Atom, int] = {atom: column for column, atom in enumerate(self.atoms)}
+        self.valuations: BoolArray = np.asarray(valuations, dtype=np.bool_).reshape(-1, len(self.atoms))
+        self.indptr: IndexArray = np.asarray(indptr, dtype=np.int64)
+        self.indices: IndexArray = np.asarray(indices, dtype=np.int64)
+        if self.indptr.shape != (self.num_worlds + 1,) or self.indptr[0] != 0 or self.indptr[-1] != len(self.indices):
+            raise ValueError("Accessibility relation does not match the number of worlds")
+        if np.any(np.diff(self.indptr) < 0) or np.any((self.indices < 0) | (self.indices >= self.num_worlds)):
+            raise ValueError("Accessibility relation refers to unknown worlds")
+        self.sources: IndexArray = np.repeat(np.arange(self.num_worlds, dtype=np.int64), np.diff(self.indptr))
+
+    @property
+    def num_worlds(self) -> int:
+        return int(self.valuations.shape[0])
+
+    @classmethod
+    def from_edges(cls, atoms: Sequence[Atom], valuations: npt.ArrayLike,
+                   edges: Iterable[Tuple[int, int]]) -> 'KripkeStructure':
+        valuations = np.asarray(valuations, dtype=np.bool_).reshape(-1, len(atoms))
+        pairs = np.array(sorted(set(edges)), dtype=np.int64).reshape(-1, 2)
+        counts = np.bincount(pairs[:, 0], minlength=valuations.shape[0])
+        indptr: IndexArray = np.zeros(valuations.shape[0] + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        return cls(atoms, valuations, indptr, pairs[:, 1])
+
+    @classmethod
+    def from_valuations(cls, valuations: Sequence[Valuation], edges: Iterable[Tuple[int, int]],
+                        atoms: Optional[Sequence[Atom]] = None) -> 'KripkeStructure':
+        if atoms is None:
+            atoms = sorted({atom for valuation in valuations for atom in valuation.alphabet})
+        matrix = np.array([[valuation.assignment(atom) for atom in atoms] for valuation in valuations],
+                          dtype=np.bool_).reshape(len(valuations), len(atoms))
+        return cls.from_edges(atoms, matrix, edges)
+
+    @classmethod
+    def from_witness(cls, witness: WitnessNode, deduplicate: bool = False) -> 'KripkeStructure':
+        worlds: Dict[Any, int] = {}
+        representatives: List[WitnessNode] = []
+        for node in witness:
+            key = node if deduplicate else id(node)
+            if key not in worlds:
+                worlds[key] = len(representatives)
+                representatives.append(node)
+        atoms = sorted(witness.atoms)
+        columns = {atom: column for column, atom in enumerate(atoms)}
+        valuations = np.zeros((len(representatives), len(atoms)), dtype=np.bool_)
+        edges: List[Tuple[int, int]] = []
+        for world, node in enumerate(representatives):
+            for atom, value in node.valuation.items():
+                valuations[world, columns[atom]] = value
+            edges.extend((world, worlds[successor if deduplicate else id(successor)])
+                         for successor in node.successors)
+        return cls.from_edges(atoms, valuations, edges)
+
+    def successors(self, world: int) -> IndexArray:
+        return self.indices[self.indptr[world]:self.indptr[world + 1]]
+
+    def valuation(self, world: int) -> Valuation:
+        values = self.valuations[world]
+        return FrozenValuation(frozendict({atom: bool(value) for atom, value in zip(self.atoms, values)}))
+
+    def column(self, atom: Atom) -> BoolArray:
+        if atom not in self.columns:
+            return np.zeros(self.num_worlds, dtype=np.bool_)
+        return self.valuations[:, self.columns[atom]]
+
+
+class ModelChecker:
+
+    def __init__(self, kripke: KripkeStructure) -> None:
+        self.kripke: KripkeStructure = kripke
+        self.cache: Dict[Formula, BoolArray] = {}
+
+    def box(self, satisfied: BoolArray) -> BoolArray:
+        failing = np.bincount(self.kripke.sources, weights=~satisfied[self.kripke.indices],
+                              minlength=self.kripke.num_worlds)
+        return np.asarray(failing == 0)
+
+    def dia(self, satisfied: BoolArray) -> BoolArray:
+        witnesses = np.bincount(self.kripke.sources, weights=satisfied[self.kripke.indices],
+                                minlength=self.kripke.num_worlds)
+        return np.asarray(witnesses > 0)
+
+    def check(self, formula: Formula) -> BoolArray:
+        if formula not in self.cache:
+            self.cache[formula] = self._check(formula)
+        return self.cache[formula]
+
+    def holds(self, formula: Formula, world: int = 0) -> bool:
+        return bool(self.check(formula)[world])
+
+    def _check(self, formula: Formula) -> BoolArray:
+        num_worlds = self.kripke.num_worlds
+        if isinstance(formula, AtomicFormula):
+            return self.kripke.column(formula.atom)
+        if isinstance(formula, Literal):
+            column = self.kripke.column(formula.atom)
+            return column if formula.sign else ~column
+        if isinstance(formula, Top):
+            return np.ones(num_worlds, dtype=np.bool_)
+        if isinstance(formula, Bot):
+            return np.zeros(num_worlds, dtype=np.bool_)
+        if isinstance(formula, Negation):
+            return ~self.check(formula.formula)
+        if isinstance(formula, Box):
+            return self.box(self.check(formula.formula))
+        if isinstance(formula, Dia):
+            return self.dia(self.check(formula.formula))
+        if isinstance(formula, Conjunction):
+            return self.check(formula.left) & self.check(formula.right)
+        if isinstance(formula, Disjunction):
+            return self.check(formula.left) | self.check(formula.right)
+        if isinstance(formula, Implication):
+            return ~self.check(formula.left) | self.check(formula.right)
+        if isinstance(formula, Equivalence):
+            return np.asarray(self.check(formula.left) == self.check(formula.right))
+        if isinstance(formula, ConjunctiveClause):
+            return self._reduce(np.logical_and, formula.formulae, True)
+        if isinstance(formula, Clause):
+            return self._reduce(np.logical_or, formula.formulae, False)
+        if isinstance(formula, BoxChain):
+            satisfied = np.ones(num_worlds, dtype=np.bool_)
+            for level in reversed(formula.formula_sequence):
+                satisfied = self.check(level) & self.box(satisfied)
+            return satisfied
+        raise TypeError(f"Cannot check Formula of type {type(formula).__name__}")
+
+    def _reduce(self, operation: Any, formulae: Iterable[Formula], neutral: bool) -> BoolArray:
+        result = np.full(self.kripke.num_worlds, neutral, dtype=np.bool_)
+        for isf in formulae:
+            operation(result, self.check(isf), out=result)
+        return result
+
+
+def extract_witness(tableau: ModalTableau, deduplicate: bool = False) -> KripkeStructure:
+    witness = tableau.witness()
+    if witness is None:
+        raise ValueError("Witnesses can only be extracted from Open tableaux")
+    return KripkeStructure.from_witness(witness, deduplicate)
+
+
+def validate_witness(tableau: ModalTableau, kripke: KripkeStructure, world: int = 0) -> bool:
+    checker = ModelChecker(kripke)
+    assumptions = {Literal(atom, tableau.assumptions.assignment(atom)) for atom in tableau.assumptions.alphabet}
+    return checker.holds(tableau.classic_formulae, world) and checker.holds(tableau.modal_formulae, world) and \
+        checker.holds(ConjunctiveClause(frozenset(assumptions)), world)
@@ -0,0 +1,66 @@
+from typing import FrozenSet, Mapping, Tuple, List, Dict, Set, Optional, Iterable
+
+from frozendict import frozendict
+from pydantic import Field
+from pydantic.dataclasses import dataclass
+
+from cegarpy.atom import Atom
+from cegarpy.formula import Formula, Implication, ConjunctiveClause, Valuation
+
+
+@dataclass(frozen=True)
+class RelevanceIndex:
+    obligations: Mapping[Atom, FrozenSet[Implication]] = Field(default_factory=frozendict)
+
+    @property
+    def atoms(self) -> FrozenSet[Atom]:
+        return frozenset(self.obligations.keys())
+
+    def slice(self, clauses: ConjunctiveClause,
+              assumptions: Valuation) -> Tuple[List[ConjunctiveClause], List[ConjunctiveClause]]:
+        relevant_atoms = self.atoms | set(assumptions.alphabet)
+        relevant: List[ConjunctiveClause] = []
+        irrelevant: List[ConjunctiveClause] = []
+        for component, component_atoms in components(clauses):
+            if component_atoms & relevant_atoms:
+                relevant.append(component)
+            else:
+                irrelevant.append(component)
+        return relevant, irrelevant
+
+
+def relevance_index(box_implications: Iterable[Implication], dia_implications: Iterable[Implication]) -> RelevanceIndex:
+    obligations: Dict[Atom, Set[Implication]] = {}
+    for implication in (*box_implications, *dia_implications):
+        for atom in implication.left.atoms:
+            obligations.setdefault(atom, set()).add(implication)
+    return RelevanceIndex(frozendict({atom: frozenset(implications) for atom, implications in obligations.items()}))
+
+
+def components(clauses: ConjunctiveClause) -> List[Tuple[ConjunctiveClause, FrozenSet[Atom]]]:
+    parent: Dict[Atom, Atom] = {}
+
+    def find(atom: Atom) -> Atom:
+        root = atom
+        while parent[root] != root:
+            root = parent[root]
+        while parent[atom] != root:
+            parent[atom], atom = root, parent[atom]
+        return root
+
+    formula_atoms: List[Tuple[Formula, Set[Atom]]] = [(f, f.atoms) for f in clauses.formulae]
+    for _, atoms in formula_atoms:
+        for atom in atoms:
+            parent.setdefault(atom, atom)
+        if atoms:
+            root = find(next(iter(atoms)))
+            for atom in atoms:
+                parent[find(atom)] = root
+
+    grouped: Dict[Optional[Atom], Tuple[Set[Formula], Set[Atom]]] = {}
+    for f, atoms in formula_atoms:
+        key = find(next(iter(atoms))) if atoms else None
+        group = grouped.setdefault(key, (set(), set()))
+        group[0].add(f)
+        group[1].update(atoms)
+    return [(ConjunctiveClause(frozenset(fs)), frozenset(atoms)) for fs, atoms in grouped.values()]
@@ -0,0 +1,267 @@
+from typing import Dict, List, Tuple, Optional, Set, FrozenSet, Iterator, Iterable, MutableMapping
+
+import more_itertools
+from frozendict import frozendict
+
+from cegarpy.atom import Atom
+from cegarpy.formula import Formula, Valuation, FrozenValuation, AtomicFormula, Literal, Bot, Top, Negation, \
+    Conjunction, Disjunction, Implication, Equivalence, Clause, ConjunctiveClause, Box, Dia, BoxChain
+
+CnfClause = Tuple[int, ...]
+
+
+class CnfEncoding:
+
+    def __init__(self) -> None:
+        self.variables: Dict[Atom, int] = {}
+        self.atoms: Dict[int, Atom] = {}
+        self.clauses: List[CnfClause] = []
+        self.num_variables: int = 0
+        self._true: Optional[int] = None
+        self._cache: Dict[Formula, int] = {}
+
+    def variable(self, atom: Atom) -> int:
+        if atom not in self.variables:
+            self.num_variables += 1
+            self.variables[atom] = self.num_variables
+            self.atoms[self.num_variables] = atom
+        return self.variables[atom]
+
+    def fresh(self) -> int:
+        self.num_variables += 1
+        return self.num_variables
+
+    def true(self) -> int:
+        if self._true is None:
+            self._true = self.fresh()
+            self.clauses.append((self._true,))
+        return self._true
+
+    def add(self, formula: Formula) -> None:
+        if isinstance(formula, (Conjunction, ConjunctiveClause)):
+            for isf in formula.immediate_subformulae:
+                self.add(isf)
+        elif isinstance(formula, (Disjunction, Clause)):
+            self.clauses.append(tuple(self.encode(isf) for isf in formula.immediate_subformulae))
+        elif isinstance(formula, Implication):
+            self.clauses.append((-self.encode(formula.left), self.encode(formula.right)))
+        elif isinstance(formula, Top):
+            pass
+        else:
+            self.clauses.append((self.encode(formula),))
+
+    def encode(self, formula: Formula) -> int:
+        if isinstance(formula, (Literal, AtomicFormula)):
+            var = self.variable(formula.atom)
+            return -var if isinstance(formula, Literal) and not formula.sign else var
+        if isinstance(formula, Top):
+            return self.true()
+        if isinstance(formula, Bot):
+            return -self.true()
+        if isinstance(formula, Negation):
+            return -self.encode(formula.formula)
+        if isinstance(formula, (Box, Dia, BoxChain)):
+            raise TypeError(f"{type(formula).__name__} Formulae cannot be encoded classically")
+        if formula in self._cache:
+            return self._cache[formula]
+        if isinstance(formula, (Conjunction, ConjunctiveClause)):
+            var = self._gate([self.encode(isf) for isf in formula.immediate_subformulae], conjunctive=True)
+        elif isinstance(formula, (Disjunction, Clause)):
+            var = self._gate([self.encode(isf) for isf in formula.immediate_subformulae], conjunctive=False)
+        elif isinstance(formula, Implication):
+            var = self._gate([-self.encode(formula.left), self.encode(formula.right)], conjunctive=False)
+        elif isinstance(formula, Equivalence):
+            left = self.encode(formula.left)
+            right = self.encode(formula.right)
+            var = self.fresh()
+            self.clauses.extend([(-var, -left, right), (-var, left, -right), (var, left, right), (var, -left, -right)])
+        else:
+            raise TypeError(f"Cannot encode Formula of type {type(formula).__name__}")
+        self._cache[formula] = var
+        return var
+
+    def _gate(self, inputs: List[int], conjunctive: bool) -> int:
+        var = self.fresh()
+        sign = 1 if conjunctive else -1
+        for lit in inputs:
+            self.clauses.append((-sign * var, sign * lit))
+        self.clauses.append(tuple([sign * var] + [-sign * lit for lit in inputs]))
+        return var
+
+    def assume(self, valuation: Valuation) -> None:
+        for atom in valuation.alphabet:
+            var = self.variable(atom)
+            self.clauses.append((var if valuation.assignment(atom) else -var,))
+
+
+def encode(formula: Formula, valuation: Optional[Valuation] = None) -> CnfEncoding:
+    encoding = CnfEncoding()
+    for atom in sorted(formula.atoms):
+        encoding.variable(atom)
+    encoding.add(formula)
+    if valuation is not None:
+        encoding.assume(valuation)
+    return encoding
+
+
+def _condition(clauses: Iterable[FrozenSet[int]], lit: int) -> Optional[List[FrozenSet[int]]]:
+    result = []
+    for clause in clauses:
+        if lit in clause:
+            continue
+        if -lit in clause:
+            clause = clause - {-lit}
+            if not clause:
+                return None
+        result.append(clause)
+    return result
+
+
+def _propagate(clauses: List[FrozenSet[int]],
+               assignment: MutableMapping[int, bool]) -> Optional[List[FrozenSet[int]]]:
+    units = [next(iter(clause)) for clause in clauses if len(clause) == 1]
+    while units:
+        lit = units.pop()
+        if abs(lit) in assignment:
+            if assignment[abs(lit)] != (lit > 0):
+                return None
+            continue
+        assignment[abs(lit)] = lit > 0
+        conditioned = _condition(clauses, lit)
+        if conditioned is None:
+            return None
+        clauses = conditioned
+        units.extend(next(iter(clause)) for clause in clauses if len(clause) == 1)
+    return clauses
+
+
+def _branch_variable(clauses: List[FrozenSet[int]]) -> int:
+    occurrences: Dict[int, int] = {}
+    for clause in clauses:
+        weight = 1 if len(clause) > 2 else 4
+        for lit in clause:
+            occurrences[abs(lit)] = occurrences.get(abs(lit), 0) + weight
+    return max(occurrences, key=lambda var: (occurrences[var], -var))
+
+
+def solve(clauses: Iterable[Iterable[int]], assumptions: Iterable[int] = ()) -> Optional[Dict[int, bool]]:
+    initial = [frozenset(clause) for clause in clauses] + [frozenset({lit}) for lit in assumptions]
+    if any(not clause for clause in initial):
+        return None
+    stack: List[Tuple[List[FrozenSet[int]], Dict[int, bool]]] = [(initial, {})]
+    while stack:
+        current, assignment = stack.pop()
+        propagated = _propagate(current, assignment)
+        if propagated is None:
+            continue
+        if not propagated:
+            return assignment
+        var = _branch_variable(propagated)
+        stack.append((propagated + [frozenset({var})], dict(assignment)))
+        stack.append((propagated + [frozenset({-var})], dict(assignment)))
+    return None
+
+
+def _valuation(alphabet: Iterable[Atom], true_atoms: Iterable[Atom],
+               valuation: Optional[Valuation]) -> FrozenValuation:
+    mapping = {atom: True for atom in true_atoms if atom in alphabet}
+    if valuation is not None:
+        mapping.update({atom: valuation.assignment(atom) for atom in valuation.alphabet})
+    return FrozenValuation(frozendict(mapping))
+
+
+def models(formula: Formula,
+           alphabet: Optional[Set[Atom]] = None,
+           valuation: Optional[Valuation] = None) -> Iterator[Valuation]:
+    if alphabet is None:
+        alphabet = formula.atoms
+    fixed = set() if valuation is None else set(valuation.alphabet)
+    encoding = encode(formula, valuation)
+    projection = sorted(encoding.variables[atom] for atom in alphabet - fixed if atom in encoding.variables)
+    free_atoms = sorted(atom for atom in alphabet - fixed if atom not in encoding.variables)
+    clauses: List[CnfClause] = list(encoding.clauses)
+    while True:
+        assignment = solve(clauses)
+        if assignment is None:
+            return
+        true_atoms = {encoding.atoms[var] for var in projection if assignment.get(var, False)}
+        for free_true_atoms in more_itertools.powerset(free_atoms):
+            yield _valuation(alphabet, true_atoms | set(free_true_atoms), valuation)
+        if not projection:
+            return
+        clauses.append(tuple(-var if assignment.get(var, False) else var for var in projection))
+
+
+def _components(clauses: List[FrozenSet[int]]) -> List[List[FrozenSet[int]]]:
+    parent: Dict[int, int] = {}
+
+    def find(var: int) -> int:
+        while parent[var] != var:
+            parent[var] = parent[parent[var]]
+            var = parent[var]
+        return var
+
+    for clause in clauses:
+        root = None
+        for lit in clause:
+            parent.setdefault(abs(lit), abs(lit))
+            if root is None:
+                root = find(abs(lit))
+            else:
+                parent[find(abs(lit))] = root
+    grouped: Dict[int, List[FrozenSet[int]]] = {}
+    for clause in clauses:
+        grouped.setdefault(find(abs(next(iter(clause)))), []).append(clause)
+    return list(grouped.values())
+
+
+class ModelCounter:
+
+    def __init__(self) -> None:
+        self.cache: Dict[FrozenSet[FrozenSet[int]], int] = {}
+
+    def count(self, clauses: Iterable[Iterable[int]], variables: Iterable[int]) -> int:
+        initial = [frozenset(clause) for clause in clauses]
+        if any(not clause for clause in initial):
+            return 0
+        return self._count(initial, frozenset(variables))
+
+    def _count(self, clauses: List[FrozenSet[int]], variables: FrozenSet[int]) -> int:
+        assignment: Dict[int, bool] = {}
+        propagated = _propagate(clauses, assignment)
+        if propagated is None:
+            return 0
+        variables = variables - assignment.keys()
+        clause_variables = {abs(lit) for clause in propagated for lit in clause}
+        result = 1 << len(variables - clause_variables)
+        for component in _components(propagated):
+            result *= self._count_component(component)
+            if result == 0:
+                return 0
+        return result
+
+    def _count_component(self, component: List[FrozenSet[int]]) -> int:
+        key = frozenset(component)
+        if key not in self.cache:
+            variables = frozenset(abs(lit) for clause in component for lit in clause)
+            var = _branch_variable(component)
+            count = 0
+            for lit in (var, -var):
+                conditioned = _condition(component, lit)
+                if conditioned is not None:
+                    count += self._count(conditioned, variables - {var})
+            self.cache[key] = count
+        return self.cache[key]
+
+
+def count_models(formula: Formula,
+                 alphabet: Optional[Set[Atom]] = None,
+                 valuation: Optional[Valuation] = None) -> int:
+    if alphabet is None:
+        alphabet = formula.atoms
+    if not formula.atoms <= alphabet:
+        return more_itertools.ilen(models(formula, alphabet, valuation))
+    fixed = set() if valuation is None else set(valuation.alphabet)
+    encoding = encode(formula, valuation)
+    free_atoms = alphabet - fixed - set(encoding.variables)
+    return ModelCounter().count(encoding.clauses, range(1, encoding.num_variables + 1)) << len(free_atoms)
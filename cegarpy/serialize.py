@@ -0,0 +1,333 @@
+import mmap
+import struct
+from typing import Dict, List, Tuple, Sequence, Iterable, Optional, Union, Any, Type
+
+from cegarpy.atom import Atom
+from cegarpy.formula import Formula, Valuation, MutableValuation, AtomicFormula, Literal, Bot, Top, Negation, Box, \
+    Dia, Conjunction, Disjunction, Implication, Equivalence, Clause, ConjunctiveClause, BoxChain, UnaryFormula, \
+    BinaryFormula, NAryFormula, SeqFormula
+from cegarpy.tableau import ModalTableau
+
+# Layout (little-endian):
+#   header:  magic "CGPF", version (u16), #atoms, #nodes, #roots (u32 each)
+#   tables:  u32 offsets of every atom, then of every node, then u32 node indices of the roots
+#   data:    atoms as varint length + utf-8 symbol; nodes as a tag byte followed by varints
+# Nodes are deduplicated and stored children first; a child is referenced by the (positive) distance to its parent.
+
+MAGIC: bytes = b'CGPF'
+VERSION: int = 1
+HEADER = struct.Struct('<4sHIII')
+OFFSET = struct.Struct('<I')
+
+TAGS: Dict[Type[Formula], int] = {
+    AtomicFormula: 0,
+    Literal: 1,
+    Bot: 2,
+    Top: 3,
+    Negation: 4,
+    Box: 5,
+    Dia: 6,
+    Conjunction: 7,
+    Disjunction: 8,
+    Implication: 9,
+    Equivalence: 10,
+    Clause: 11,
+    ConjunctiveClause: 12,
+    BoxChain: 13,
+}
+TYPES: Dict[int, Type[Formula]] = {tag: formula_type for formula_type, tag in TAGS.items()}
+
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+
+def _write_varint(data: bytearray, value: int) -> None:
+    while value >= 0x80:
+        data.append(value & 0x7F | 0x80)
+        value >>= 7
+    data.append(value)
+
+
+def _read_varint(view: memoryview, offset: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        if offset >= len(view):
+            raise ValueError(f"Truncated varint at offset {offset}")
+        byte = view[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def _children(formula: Formula) -> Sequence[Formula]:
+    if isinstance(formula, UnaryFormula):
+        return (formula.formula,)
+    if isinstance(formula, BinaryFormula):
+        return formula.left, formula.right
+    if isinstance(formula, NAryFormula):
+        return tuple(formula.formulae)
+    if isinstance(formula, SeqFormula):
+        return tuple(formula.formula_sequence)
+    return ()
+
+
+class _Encoder:
+
+    def __init__(self) -> None:
+        self.atoms: Dict[Atom, int] = {}
+        self.atom_data: List[bytes] = []
+        self.by_identity: Dict[int, int] = {}
+        self.by_value: Dict[Formula, int] = {}
+        self.nodes: List[bytes] = []
+        self.keep: List[Formula] = []
+
+    def atom(self, atom: Atom) -> int:
+        index = self.atoms.get(atom)
+        if index is None:
+            index = len(self.atom_data)
+            self.atoms[atom] = index
+            self.atom_data.append(atom.symbol.encode('utf-8'))
+        return index
+
+    def lookup(self, formula: Formula) -> Optional[int]:
+        index = self.by_identity.get(id(formula))
+        if index is None:
+            index = self.by_value.get(formula)
+            if index is not None:
+                self.by_identity[id(formula)] = index
+                self.keep.append(formula)
+        return index
+
+    def add(self, formula: Formula) -> int:
+        pending: List[Tuple[Formula, bool]] = [(formula, False)]
+        while pending:
+            current, ready = pending.pop()
+            if self.lookup(current) is not None:
+                continue
+            children = _children(current)
+            if not ready:
+                pending.append((current, True))
+                pending.extend((child, False) for child in reversed(children))
+                continue
+            self.emit(current, children)
+        index = self.lookup(formula)
+        assert index is not None
+        return index
+
+    def emit(self, formula: Formula, children: Sequence[Formula]) -> None:
+        tag = TAGS.get(type(formula))
+        if tag is None:
+            raise TypeError(f"Cannot serialize Formula of type {type(formula).__name__}")
+        index = len(self.nodes)
+        data = bytearray((tag,))
+        if isinstance(formula, AtomicFormula):
+            _write_varint(data, self.atom(formula.atom))
+        elif isinstance(formula, Literal):
+            _write_varint(data, self.atom(formula.atom) << 1 | formula.sign)
+        if isinstance(formula, (NAryFormula, SeqFormula)):
+            _write_varint(data, len(children))
+        for child in children:
+            child_index = self.lookup(child)
+            assert child_index is not None
+            _write_varint(data, index - child_index)
+        self.nodes.append(bytes(data))
+        self.by_identity[id(formula)] = index
+        self.by_value[formula] = index
+        self.keep.append(formula)
+
+
+def dumps(formulae: Iterable[Formula]) -> bytes:
+    encoder = _Encoder()
+    roots = [encoder.add(formula) for formula in formulae]
+    blobs: List[bytes] = []
+    for symbol in encoder.atom_data:
+        data = bytearray()
+        _write_varint(data, len(symbol))
+        blobs.append(bytes(data) + symbol)
+    blobs.extend(encoder.nodes)
+    offset = HEADER.size + OFFSET.size * (len(blobs) + len(roots))
+    offsets: List[int] = []
+    for blob in blobs:
+        offsets.append(offset)
+        offset += len(blob)
+    if offset > 0xFFFFFFFF:
+        raise ValueError("Serialized formulae exceed 4 GiB")
+    header = HEADER.pack(MAGIC, VERSION, len(encoder.atom_data), len(encoder.nodes), len(roots))
+    table = struct.pack(f'<{len(offsets) + len(roots)}I', *offsets, *roots)
+    return b''.join([header, table, *blobs])
+
+
+class FormulaStore:
+
+    def __init__(self, buffer: Buffer) -> None:
+        self._buffer: Buffer = buffer
+        self._view: memoryview = memoryview(buffer)
+        if len(self._view) < HEADER.size:
+            self._view.release()
+            raise ValueError(f"Buffer does not contain version {VERSION} formulae")
+        magic, version, num_atoms, num_nodes, num_roots = HEADER.unpack_from(self._view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Buffer does not contain version {VERSION} formulae")
+        if HEADER.size + OFFSET.size * (num_atoms + num_nodes + num_roots) > len(self._view):
+            raise ValueError("Buffer is shorter than its offset tables")
+        self.num_atoms: int = num_atoms
+        self.num_nodes: int = num_nodes
+        self.num_roots: int = num_roots
+        self._atoms: Dict[int, Atom] = {}
+        self._nodes: Dict[int, Formula] = {}
+
+    @classmethod
+    def open(cls, path: str) -> 'FormulaStore':
+        with open(path, 'rb') as file:
+            return cls(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __enter__(self) -> 'FormulaStore':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._view.release()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def __len__(self) -> int:
+        return self.num_roots
+
+    def __getitem__(self, index: int) -> Formula:
+        if not 0 <= index < self.num_roots:
+            raise IndexError(index)
+        return self.node(self._offset(self.num_atoms + self.num_nodes + index))
+
+    def _offset(self, entry: int) -> int:
+        return int(OFFSET.unpack_from(self._view, HEADER.size + OFFSET.size * entry)[0])
+
+    def atom(self, index: int) -> Atom:
+        if not 0 <= index < self.num_atoms:
+            raise ValueError(f"Atom {index} is out of range")
+        atom = self._atoms.get(index)
+        if atom is None:
+            length, start = _read_varint(self._view, self._offset(index))
+            if start + length > len(self._view):
+                raise ValueError(f"Atom {index} exceeds the buffer")
+            atom = Atom(str(self._view[start:start + length], 'utf-8'))
+            self._atoms[index] = atom
+        return atom
+
+    def _parse(self, index: int) -> Tuple[int, List[int]]:
+        start = self._offset(self.num_atoms + index)
+        if start >= len(self._view):
+            raise ValueError(f"Node {index} starts beyond the buffer")
+        tag = self._view[start]
+        offset = start + 1
+        formula_type = TYPES.get(tag)
+        if formula_type is None:
+            raise ValueError(f"Unknown node tag {tag}")
+        if formula_type in (AtomicFormula, Literal):
+            value, _ = _read_varint(self._view, offset)
+            return tag, [value]
+        if issubclass(formula_type, UnaryFormula):
+            count = 1
+        elif issubclass(formula_type, BinaryFormula):
+            count = 2
+        elif issubclass(formula_type, (NAryFormula, SeqFormula)):
+            count, offset = _read_varint(self._view, offset)
+        else:
+            count = 0
+        children: List[int] = []
+        for _ in range(count):
+            distance, offset = _read_varint(self._view, offset)
+            # Children are stored first, so a valid distance always points strictly backwards.
+            if not 0 < distance <= index:
+                raise ValueError(f"Node {index} has an invalid child distance {distance}")
+            children.append(index - distance)
+        return tag, children
+
+    def node(self, index: int) -> Formula:
+        if not 0 <= index < self.num_nodes:
+            raise ValueError(f"Node {index} is out of range")
+        pending = [index]
+        while pending:
+            current = pending[-1]
+            if current in self._nodes:
+                pending.pop()
+                continue
+            tag, values = self._parse(current)
+            formula_type = TYPES[tag]
+            if formula_type in (AtomicFormula, Literal):
+                missing = []
+            else:
+                missing = [child for child in values if child not in self._nodes]
+            if missing:
+                pending.extend(missing)
+                continue
+            self._nodes[current] = self._build(formula_type, values)
+            pending.pop()
+        return self._nodes[index]
+
+    def _build(self, formula_type: Type[Formula], values: List[int]) -> Formula:
+        if formula_type is AtomicFormula:
+            return AtomicFormula(self.atom(values[0]))
+        if formula_type is Literal:
+            return Literal(self.atom(values[0] >> 1), bool(values[0] & 1))
+        children = [self._nodes[child] for child in values]
+        if issubclass(formula_type, UnaryFormula):
+            return formula_type(children[0])
+        if issubclass(formula_type, BinaryFormula):
+            return formula_type(children[0], children[1])
+        if issubclass(formula_type, NAryFormula):
+            return formula_type(frozenset(children))
+        if issubclass(formula_type, SeqFormula):
+            return formula_type(tuple(children))
+        return formula_type()
+
+    def problem(self, index: int, **kwargs: Any) -> ModalTableau:
+        classic_formulae, modal_formulae, assumptions = (self[3 * index + offset] for offset in range(3))
+        assert isinstance(classic_formulae, ConjunctiveClause) and isinstance(modal_formulae, BoxChain)
+        assert isinstance(assumptions, ConjunctiveClause)
+        return ModalTableau(classic_formulae, modal_formulae, to_valuation(assumptions), **kwargs)
+
+    @property
+    def num_problems(self) -> int:
+        return self.num_roots // 3
+
+
+def loads(buffer: Buffer) -> List[Formula]:
+    store = FormulaStore(buffer)
+    try:
+        return [store[index] for index in range(len(store))]
+    finally:
+        store.close()
+
+
+def solve_serialized(data: Buffer, index: int = 0) -> bool:
+    store = FormulaStore(data)
+    try:
+        return store.problem(index).solve()
+    finally:
+        store.close()
+
+
+def to_assumptions(valuation: Valuation) -> ConjunctiveClause:
+    return ConjunctiveClause(frozenset(Literal(atom, valuation.assignment(atom)) for atom in valuation.alphabet))
+
+
+def to_valuation(assumptions: ConjunctiveClause) -> Valuation:
+    mapping: Dict[Atom, bool] = {}
+    for lit in assumptions.formulae:
+        assert isinstance(lit, Literal)
+        mapping[lit.atom] = lit.sign
+    return MutableValuation(mapping)
+
+
+def dumps_problems(tableaux: Iterable[ModalTableau]) -> bytes:
+    return dumps(formula for tableau in tableaux
+                 for formula in (tableau.classic_formulae, tableau.modal_formulae, to_assumptions(tableau.assumptions)))
+
+
+def dump_problems(path: str, tableaux: Iterable[ModalTableau]) -> None:
+    with open(path, 'wb') as file:
+        file.write(dumps_problems(tableaux))
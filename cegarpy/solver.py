@@ -0,0 +1,92 @@
+from typing import Protocol, Optional, FrozenSet, Dict, List, Iterable, Tuple, runtime_checkable
+
+from frozendict import frozendict
+
+from cegarpy.formula import ConjunctiveClause, Valuation, FrozenValuation, Literal, MutableValuation
+from cegarpy.sat import CnfEncoding, encode, solve
+
+
+@runtime_checkable
+class LocalSolver(Protocol):
+
+    def solve(self, clauses: ConjunctiveClause) -> bool:
+        ...
+
+    def solve_under_assumptions(self, clauses: ConjunctiveClause, assumptions: Valuation) -> bool:
+        ...
+
+    def model(self) -> Optional[Valuation]:
+        ...
+
+    def core(self) -> Optional[FrozenSet[Literal]]:
+        ...
+
+
+def assumption_literals(encoding: CnfEncoding, assumptions: Valuation) -> List[int]:
+    # Atoms that do not occur in the clauses cannot constrain them, so they are left out instead of being added to
+    # the (shared) encoding.
+    lits: List[int] = []
+    for atom in assumptions.alphabet:
+        var = encoding.variables.get(atom)
+        if var is not None:
+            lits.append(var if assumptions.assignment(atom) else -var)
+    return lits
+
+
+def to_valuation(encoding: CnfEncoding, clauses: ConjunctiveClause, true_variables: Iterable[int],
+                 assumptions: Valuation) -> Valuation:
+    atoms = clauses.atoms
+    mapping = {encoding.atoms[var]: True for var in true_variables if encoding.atoms.get(var) in atoms}
+    mapping.update({atom: assumptions.assignment(atom) for atom in assumptions.alphabet})
+    return FrozenValuation(frozendict(mapping))
+
+
+def to_literals(encoding: CnfEncoding, lits: Iterable[int]) -> FrozenSet[Literal]:
+    return frozenset(Literal(encoding.atoms[abs(lit)], lit > 0) for lit in lits)
+
+
+class EncodingSolver:
+
+    def __init__(self, max_encodings: int = 1024) -> None:
+        self.max_encodings: int = max_encodings
+        self.encodings: Dict[ConjunctiveClause, CnfEncoding] = {}
+        self._model: Optional[Valuation] = None
+        self._core: Optional[FrozenSet[Literal]] = None
+
+    def solve(self, clauses: ConjunctiveClause) -> bool:
+        return self.solve_under_assumptions(clauses, MutableValuation())
+
+    def solve_under_assumptions(self, clauses: ConjunctiveClause, assumptions: Valuation) -> bool:
+        encoding = self.encodings.get(clauses)
+        if encoding is None:
+            if len(self.encodings) >= self.max_encodings:
+                del self.encodings[next(iter(self.encodings))]
+            encoding = encode(clauses)
+            self.encodings[clauses] = encoding
+        satisfiable, values = self._search(encoding, assumption_literals(encoding, assumptions))
+        if satisfiable:
+            self._model = to_valuation(encoding, clauses, (lit for lit in values if lit > 0), assumptions)
+            self._core = None
+        else:
+            self._model = None
+            self._core = to_literals(encoding, values)
+        return satisfiable
+
+    def model(self) -> Optional[Valuation]:
+        return self._model
+
+    def core(self) -> Optional[FrozenSet[Literal]]:
+        return self._core
+
+    def _search(self, encoding: CnfEncoding, lits: List[int]) -> Tuple[bool, List[int]]:
+        # Returns the true variables of a model, or the failed assumption literals.
+        raise NotImplementedError
+
+
+class DpllSolver(EncodingSolver):
+
+    def _search(self, encoding: CnfEncoding, lits: List[int]) -> Tuple[bool, List[int]]:
+        assignment = solve(encoding.clauses, lits)
+        if assignment is None:
+            return False, lits
+        return True, [var for var, value in assignment.items() if value]
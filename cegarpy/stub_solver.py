@@ -0,0 +1,52 @@
+import sys
+from typing import List, IO, Sequence
+
+from cegarpy.dimacs import read_dimacs
+from cegarpy.sat import solve
+
+
+def failed_assumptions(clauses: Sequence[Sequence[int]], assumptions: Sequence[int]) -> List[int]:
+    core = list(assumptions)
+    for lit in assumptions:
+        reduced = [other for other in core if other != lit]
+        if solve(clauses, reduced) is None:
+            core = reduced
+    return core
+
+
+def respond(stream: IO[str], num_variables: int, clauses: List[List[int]], assumptions: List[int],
+            incremental: bool) -> bool:
+    assignment = solve(clauses, assumptions)
+    if assignment is None:
+        stream.write("s UNSATISFIABLE\n")
+        if incremental:
+            stream.write(f"f {' '.join(map(str, failed_assumptions(clauses, assumptions) + [0]))}\n")
+    else:
+        values = [var if assignment.get(var, False) else -var for var in range(1, num_variables + 1)]
+        stream.write("s SATISFIABLE\n")
+        stream.write(f"v {' '.join(map(str, values + [0]))}\n")
+    stream.flush()
+    return assignment is not None
+
+
+def main(stdin: IO[str], stdout: IO[str]) -> int:
+    num_variables = 0
+    clauses: List[List[int]] = []
+    pending = False
+    for kind, values in read_dimacs(stdin):
+        if kind == 'p':
+            num_variables = values[0]
+            clauses = []
+            pending = True
+        elif kind == 'a':
+            respond(stdout, num_variables, clauses, values, incremental=True)
+            pending = False
+        elif kind == 'clause':
+            clauses.append(values)
+    if pending:
+        return 10 if respond(stdout, num_variables, clauses, [], incremental=False) else 20
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.stdin, sys.stdout))
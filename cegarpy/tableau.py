@@ -1,11 +1,21 @@
-from typing import Set, Optional, Literal, TypeAlias, MutableSequence
+import asyncio
+from concurrent.futures import Executor
+from typing import Set, Optional, Literal, TypeAlias, MutableSequence, Dict, List, Tuple, FrozenSet, Mapping, Any, \
+    Iterable
 
+from frozendict import frozendict
 from pydantic import Field
 from pydantic.dataclasses import dataclass
 
 from cegarpy import formula
-from cegarpy.formula import Clause, BoxChain, Implication, Valuation, MutableValuation, ConjunctiveClause, models, Box, \
-    Dia
+from cegarpy.atom import Atom
+from cegarpy.formula import Clause, BoxChain, Implication, Valuation, MutableValuation, ConjunctiveClause, Box, Dia, \
+    FrozenValuation, Formula
+from cegarpy.relevance import RelevanceIndex, relevance_index
+from cegarpy.solver import LocalSolver, DpllSolver
+from cegarpy.trace import Tracer, LOCAL, JUMP, RESTART, CLOSE, OPEN, EVENT_NAMES
+from cegarpy.witness import WitnessNode
+from cegarpy.worker import WorkerPool, default_pool
 
 Inconclusive: Literal['Inconclusive'] = 'Inconclusive'
 Satisfiable: Literal['Satisfiable'] = 'Satisfiable'
@@ -15,11 +25,99 @@ Closed: Literal['Closed'] = 'Closed'
 
 _LocalNode: TypeAlias = 'LocalNode'
 
+LevelKey: TypeAlias = Tuple[FrozenSet[Implication], FrozenSet[Implication], BoxChain]
+Level: TypeAlias = Tuple[FrozenSet[Implication], FrozenSet[Implication], FrozenSet[Formula], RelevanceIndex]
+
 
 class ValuationConfig:
     arbitrary_types_allowed = True
 
 
+@dataclass
+class Statistics:
+    local: int = 0
+    jump: int = 0
+    restart: int = 0
+    close: int = 0
+    open: int = 0
+    subproblem_hits: int = 0
+
+    def increment(self, event: int) -> None:
+        name = EVENT_NAMES[event]
+        setattr(self, name, getattr(self, name) + 1)
+
+
+class SearchContext:
+
+    def __init__(self, local_solver: Optional[LocalSolver] = None, keep_tree: bool = True,
+                 tracer: Optional[Tracer] = None, max_subproblems: int = 4096, max_learned: int = 4096) -> None:
+        self.local_solver: LocalSolver = DpllSolver() if local_solver is None else local_solver
+        self.keep_tree: bool = keep_tree
+        self.max_subproblems: int = max_subproblems
+        self.max_learned: int = max_learned
+        self.num_learned: int = 0
+        self.tracer: Optional[Tracer] = tracer
+        self.statistics: Statistics = Statistics()
+        self.learned: Dict[LevelKey, List[Tuple[Mapping[Atom, bool], Clause]]] = {}
+        self.subproblems: Dict[Tuple[Any, ...], Tuple[Literal['Open', 'Closed'], Optional[WitnessNode]]] = {}
+        self.levels: Dict[BoxChain, Level] = {}
+
+    def level(self, modal_box_chain: BoxChain) -> Level:
+        if modal_box_chain not in self.levels:
+            box_implications: Set[Implication] = set()
+            dia_implications: Set[Implication] = set()
+            clauses: Set[Formula] = set()
+            if modal_box_chain.formula_sequence:
+                for isf in modal_box_chain.formula_sequence[0].immediate_subformulae:
+                    assert isinstance(isf, Implication)
+                    if isinstance(isf.right, Box):
+                        box_implications.add(isf)
+                    elif isinstance(isf.right, Dia):
+                        dia_implications.add(isf)
+                    else:
+                        clauses.add(isf)
+            self.levels[modal_box_chain] = (frozenset(box_implications), frozenset(dia_implications),
+                                            frozenset(clauses), relevance_index(box_implications, dia_implications))
+        return self.levels[modal_box_chain]
+
+    def remember(self, signature: Tuple[Any, ...], status: Literal['Open', 'Closed'],
+                 witness: Optional[WitnessNode]) -> None:
+        if not self.keep_tree:
+            # Without the tree only refutations are kept: an Open world lives on in its parent's witness, and Open
+            # worlds on abandoned branches must not be retained.
+            if status != Closed:
+                return
+            witness = None
+        if signature not in self.subproblems and len(self.subproblems) >= self.max_subproblems:
+            del self.subproblems[next(iter(self.subproblems))]
+        self.subproblems[signature] = (status, witness)
+
+    def record(self, event: int, depth: int, subject: Optional[Formula] = None) -> None:
+        self.statistics.increment(event)
+        if self.tracer is not None:
+            self.tracer.emit(event, depth, subject)
+
+    def learn(self, level: LevelKey, assumptions: Valuation, clause: Clause) -> None:
+        fixed = frozendict({atom: assumptions.assignment(atom) for atom in assumptions.alphabet})
+        if self.num_learned >= self.max_learned:
+            # Learned clauses only prune and every restart node keeps its own copy, so the oldest can be forgotten.
+            oldest = next(iter(self.learned))
+            del self.learned[oldest][0]
+            if not self.learned[oldest]:
+                del self.learned[oldest]
+            self.num_learned -= 1
+        self.learned.setdefault(level, []).append((fixed, clause))
+        self.num_learned += 1
+
+    def learned_clauses(self, level: LevelKey, assumptions: Valuation) -> FrozenSet[Clause]:
+        learned = self.learned.get(level)
+        if not learned:
+            return frozenset()
+        current = {atom: assumptions.assignment(atom) for atom in assumptions.alphabet}
+        return frozenset(clause for fixed, clause in learned if
+                         all(current.get(atom) == value for atom, value in fixed.items()))
+
+
 @dataclass(config=ValuationConfig)
 class JumpRestartNode:
     assumptions: Valuation = Field(default_factory=MutableValuation)
@@ -28,10 +126,13 @@ class JumpRestartNode:
     box_implications: Set[Implication] = Field(default_factory=set)
     dia_implications: Set[Implication] = Field(default_factory=set)
     modal_box_chain: BoxChain = Field(default_factory=BoxChain)
+    relevance: Optional[RelevanceIndex] = Field(default=None)
     jump_nodes: Optional[MutableSequence[_LocalNode]] = Field(default=None)
     restart_node: Optional[_LocalNode] = Field(default=None)
     status: Optional[Literal['Open', 'Closed']] = Field(default=None)
     expanded_dia_implications: MutableSequence[Implication] = Field(default_factory=list)
+    context: SearchContext = Field(default_factory=SearchContext)
+    depth: int = Field(default=0)
 
     def jump(self) -> None:
         assert self.jump_nodes is not None
@@ -41,43 +142,31 @@ class JumpRestartNode:
             self.status = Open  # TODO: Is this right?
             return
         self.expanded_dia_implications.append(dia_implication)
-        assumptions_: MutableValuation = MutableValuation()
-        assumptions_.mapping = {atom: self.assumptions.assignment(atom) for atom in self.assumptions.alphabet}
+        self.context.record(JUMP, self.depth, dia_implication)
         assert isinstance(dia_implication.right, Dia)
         assert isinstance(dia_implication.right.formula, formula.Literal)
-        assumptions_.mapping[dia_implication.right.formula.atom] = dia_implication.right.formula.sign
+        # The assumptions of this world do not hold in its successors, only the diamond literal does.
+        assumptions_ = MutableValuation({dia_implication.right.formula.atom: dia_implication.right.formula.sign})
         clauses_set = set()
         for box_implication in self.box_implications:
             assert isinstance(box_implication.left, formula.Literal)
             assert isinstance(box_implication.right, Box)
             if box_implication.left.evaluate(self.valuation):
                 clauses_set.add(box_implication.right.formula)
-        if self.modal_box_chain.formula_sequence:
-
-            box_implications_: Set[Implication] = set()
-            dia_implications_: Set[Implication] = set()
-            for isf in self.modal_box_chain.formula_sequence[0].immediate_subformulae:
-                assert isinstance(isf, Implication)
-                if isinstance(isf.right, Box):
-                    box_implications_.add(isf)
-                elif isinstance(isf.right, Dia):
-                    dia_implications_.add(isf)
-                else:
-                    clauses_set.add(isf)
-
-        else:
-            box_implications_ = set()
-            dia_implications_ = set()
-        clauses_ = ConjunctiveClause(frozenset(clauses_set))
+        box_implications_, dia_implications_, level_clauses, relevance_ = self.context.level(self.modal_box_chain)
+        clauses_ = ConjunctiveClause(frozenset(clauses_set) | level_clauses)
         modal_box_chain_ = self.modal_box_chain.pull_up()
 
         jump = LocalNode(
 
             assumptions=assumptions_,
             clauses=clauses_,
-            box_implications=box_implications_,
-            dia_implications=dia_implications_,
-            modal_box_chain=modal_box_chain_
+            box_implications=set(box_implications_),
+            dia_implications=set(dia_implications_),
+            modal_box_chain=modal_box_chain_,
+            relevance=relevance_,
+            context=self.context,
+            depth=self.depth + 1
         )
         self.jump_nodes.append(jump)
 
@@ -87,15 +176,24 @@ class JumpRestartNode:
         c: formula.Literal = dia_implication.left
         as_ = {box_implication.left for box_implication in self.box_implications if
                isinstance(box_implication.left, formula.Literal) and box_implication.left.evaluate(self.valuation)}
-        clauses_ = ConjunctiveClause(
-            self.clauses.formulae | {Clause(frozenset({-lit for lit in as_} | {-c}))})
+        learned = Clause(frozenset({-lit for lit in as_} | {-c}))
+        self.context.learn((frozenset(self.box_implications), frozenset(self.dia_implications), self.modal_box_chain),
+                           self.assumptions, learned)
+        self.context.record(RESTART, self.depth, learned)
+        if not self.context.keep_tree:
+            self.jump_nodes = []
+        clauses_ = ConjunctiveClause(self.clauses.formulae | {learned})
         box_implications_ = set(self.box_implications)
         dia_implications_ = set(self.dia_implications)
         restart = LocalNode(
             assumptions=self.assumptions,
             clauses=clauses_,
             box_implications=box_implications_,
-            dia_implications=dia_implications_
+            dia_implications=dia_implications_,
+            modal_box_chain=self.modal_box_chain,
+            relevance=self.relevance,
+            context=self.context,
+            depth=self.depth
         )
 
         self.restart_node = restart
@@ -124,19 +222,71 @@ class JumpRestartNode:
 
 @dataclass(config=ValuationConfig)
 class LocalNode:
-    assumptions: Valuation = Field(default=MutableValuation)
+    assumptions: Valuation = Field(default_factory=MutableValuation)
     clauses: ConjunctiveClause = Field(default_factory=ConjunctiveClause)
     box_implications: Set[Implication] = Field(default_factory=set)
     dia_implications: Set[Implication] = Field(default_factory=set)
     modal_box_chain: BoxChain = Field(default_factory=BoxChain)
+    relevance: Optional[RelevanceIndex] = Field(default=None)
     model: Optional[Valuation] = Field(default=None)
     child: Optional[JumpRestartNode] = Field(default=None)
     status: Optional[Literal['Open', 'Closed']] = Field(default=None)
+    context: SearchContext = Field(default_factory=SearchContext)
+    witness: Optional[WitnessNode] = Field(default=None)
+    depth: int = Field(default=0)
+
+    @property
+    def level(self) -> LevelKey:
+        return frozenset(self.box_implications), frozenset(self.dia_implications), self.modal_box_chain
+
+    @property
+    def index(self) -> RelevanceIndex:
+        if self.relevance is None:
+            self.relevance = relevance_index(self.box_implications, self.dia_implications)
+        return self.relevance
+
+    @property
+    def signature(self) -> Tuple[Any, ...]:
+        assumptions = frozendict({atom: self.assumptions.assignment(atom) for atom in self.assumptions.alphabet})
+        return (assumptions, self.clauses) + self.level
 
     def local(self) -> None:
-        self.model = next(models(self.clauses, valuation=self.assumptions), None)
-        if self.model is None:
+        self.context.record(LOCAL, self.depth, self.clauses)
+        index = self.index
+        clauses = self.clauses
+        learned = self.context.learned_clauses(self.level, self.assumptions)
+        if not learned <= clauses.formulae:
+            clauses = ConjunctiveClause(clauses.formulae | learned)
+        relevant, irrelevant = index.slice(clauses, self.assumptions)
+        local_solver = self.context.local_solver
+        if not all(local_solver.solve(component) for component in irrelevant):
             self.status = Closed
+            return
+        mapping = {atom: self.assumptions.assignment(atom) for atom in self.assumptions.alphabet}
+        for component in relevant:
+            if not local_solver.solve_under_assumptions(component, self.assumptions):
+                self.status = Closed
+                return
+            model = local_solver.model()
+            assert model is not None
+            mapping.update({atom: model.assignment(atom) for atom in model.alphabet})
+        self.model = FrozenValuation(frozendict(mapping))
+
+    def complete_model(self) -> Valuation:
+        assert self.model is not None
+        mapping = {atom: self.model.assignment(atom) for atom in self.model.alphabet}
+        index = self.index
+        _, irrelevant = index.slice(self.clauses, self.assumptions)
+        irrelevant_atoms = {atom for component in irrelevant for atom in component.atoms}
+        for atom in (self.clauses.atoms | index.atoms) - irrelevant_atoms:
+            mapping.setdefault(atom, False)
+        for component in irrelevant:
+            satisfiable = self.context.local_solver.solve(component)
+            assert satisfiable
+            model = self.context.local_solver.model()
+            assert model is not None
+            mapping.update({atom: model.assignment(atom) for atom in component.atoms})
+        return FrozenValuation(frozendict(mapping))
 
     def __create_child(self) -> None:
         assert self.model is not None
@@ -146,20 +296,50 @@ class LocalNode:
             clauses=self.clauses,
             box_implications=self.box_implications,
             dia_implications=self.dia_implications,
-            modal_box_chain=self.modal_box_chain
+            modal_box_chain=self.modal_box_chain,
+            relevance=self.index,
+            context=self.context,
+            depth=self.depth
         )
         assert self.child is not None
 
+    def __record_witness(self) -> None:
+        assert self.child is not None
+        if self.child.restart_node is not None:
+            self.witness = self.child.restart_node.witness
+        else:
+            successors: List[WitnessNode] = []
+            for jump_node in self.child.jump_nodes or ():
+                assert jump_node.witness is not None
+                successors.append(jump_node.witness)
+            model = self.complete_model()
+            self.witness = WitnessNode({atom: model.assignment(atom) for atom in model.alphabet}, tuple(successors))
+
     def expand(self) -> None:
+        if self.status is not None:
+            return
         if self.child is None:
+            cached = self.context.subproblems.get(self.signature)
+            if cached is not None:
+                self.context.statistics.subproblem_hits += 1
+                self.status, self.witness = cached
+                self.context.record(OPEN if self.status == Open else CLOSE, self.depth, self.clauses)
+                return
             self.local()
             if self.status != Closed:
                 self.__create_child()
-        elif self.status is None:
+        else:
             self.child.expand()
             if self.child.status is not None:
                 self.status = self.child.status
-        assert self.status == Closed or self.child is not None
+                if self.status == Open:
+                    self.__record_witness()
+        if self.status is not None:
+            self.context.record(OPEN if self.status == Open else CLOSE, self.depth, self.clauses)
+            self.context.remember(self.signature, self.status, self.witness)
+            if not self.context.keep_tree:
+                self.child = None
+        assert self.status is not None or self.child is not None
 
 
 @dataclass(config=ValuationConfig)
@@ -168,8 +348,42 @@ class ModalTableau:
     modal_formulae: BoxChain = Field(default_factory=BoxChain)
     assumptions: Valuation = Field(default_factory=MutableValuation)
     tableau_root: Optional[LocalNode] = Field(default=None)
+    local_solver: Optional[LocalSolver] = Field(default=None)
+    context: Optional[SearchContext] = Field(default=None)
+    scopes: MutableSequence[Tuple[ConjunctiveClause, Valuation]] = Field(default_factory=list)
+    keep_tree: Optional[bool] = Field(default=None)
+    max_subproblems: Optional[int] = Field(default=None)
+    tracer: Optional[Tracer] = Field(default=None)
+
+    def __post_init_post_parse__(self) -> None:
+        self.__configure()
+
+    def __configure(self) -> None:
+        # The search settings live in the context; unset ones take its values, explicit ones must agree with it.
+        settings: Dict[str, Any] = {'local_solver': self.local_solver, 'keep_tree': self.keep_tree,
+                                    'max_subproblems': self.max_subproblems, 'tracer': self.tracer}
+        settings = {name: value for name, value in settings.items() if value is not None}
+        if self.context is None:
+            self.context = SearchContext(**settings)
+        else:
+            conflicts = [name for name, value in settings.items() if getattr(self.context, name) != value]
+            if conflicts:
+                raise ValueError(f"Settings conflict with the supplied SearchContext: {', '.join(conflicts)}")
+        self.local_solver = self.context.local_solver
+        self.keep_tree = self.context.keep_tree
+        self.max_subproblems = self.context.max_subproblems
+        self.tracer = self.context.tracer
+
+    @property
+    def statistics(self) -> Statistics:
+        if self.context is None:
+            return Statistics()
+        return self.context.statistics
 
     def initialize(self) -> None:
+        if self.context is None:
+            self.__configure()
+        assert self.context is not None
 
         if self.modal_formulae.formula_sequence:
             box_implications: Set[Implication] = set()
@@ -186,17 +400,85 @@ class ModalTableau:
                 clauses=self.classic_formulae,
                 box_implications=box_implications,
                 dia_implications=dia_implications,
-                modal_box_chain=self.modal_formulae.pull_up()
+                modal_box_chain=self.modal_formulae.pull_up(),
+                context=self.context
             )
         else:
             self.tableau_root = LocalNode(
                 assumptions=self.assumptions,
-                clauses=self.classic_formulae)
+                clauses=self.classic_formulae,
+                context=self.context)
 
-    def solve(self) -> bool:
+    def __prepare(self) -> LocalNode:
         if self.tableau_root is None:
             self.initialize()
-        assert self.tableau_root is not None
-        while self.tableau_root.status is None:
-            self.tableau_root.expand()
-        return self.tableau_root.status == Open
+        assert self.tableau_root is not None and self.context is not None
+        # The tableau's tracer is the one to record to, even if it was replaced after the context was created.
+        self.context.tracer = self.tracer
+        return self.tableau_root
+
+    def solve(self) -> bool:
+        tableau_root = self.__prepare()
+        while tableau_root.status is None:
+            tableau_root.expand()
+        if self.tracer is not None:
+            self.tracer.flush()
+        return tableau_root.status == Open
+
+    async def solve_async(self, steps: int = 64, deadline: Optional[float] = None) -> bool:
+        if steps < 1:
+            raise ValueError("Steps between yields must be positive")
+        tableau_root = self.__prepare()
+        loop = asyncio.get_running_loop()
+        while tableau_root.status is None:
+            for _ in range(steps):
+                tableau_root.expand()
+                if tableau_root.status is not None:
+                    break
+            if self.tracer is not None:
+                self.tracer.flush()
+            if tableau_root.status is None:
+                if deadline is not None and loop.time() >= deadline:
+                    raise asyncio.TimeoutError()
+                await asyncio.sleep(0)
+        return tableau_root.status == Open
+
+    async def solve_in_executor(self, executor: Optional[Executor] = None, deadline: Optional[float] = None,
+                                pool: Optional[WorkerPool] = None) -> bool:
+        from cegarpy.serialize import dumps_problems, solve_serialized  # pylint: disable=import-outside-toplevel
+        loop = asyncio.get_running_loop()
+        timeout = None if deadline is None else max(deadline - loop.time(), 0)
+        data = dumps_problems([self])
+        if executor is not None:
+            return await asyncio.wait_for(loop.run_in_executor(executor, solve_serialized, data), timeout)
+        return bool(await (default_pool() if pool is None else pool).run(solve_serialized, data, timeout=timeout))
+
+    def push(self) -> None:
+        self.scopes.append((self.classic_formulae, self.assumptions))
+
+    def pop(self) -> None:
+        self.classic_formulae, self.assumptions = self.scopes.pop()
+        self.tableau_root = None
+
+    def add_classic_formulae(self, classic_formulae: Iterable[Formula]) -> None:
+        self.classic_formulae = ConjunctiveClause(self.classic_formulae.formulae | frozenset(classic_formulae))
+        self.tableau_root = None
+
+    def add_assumptions(self, assumptions: Valuation) -> None:
+        mapping = {atom: self.assumptions.assignment(atom) for atom in self.assumptions.alphabet}
+        mapping.update({atom: assumptions.assignment(atom) for atom in assumptions.alphabet})
+        self.assumptions = MutableValuation(mapping)
+        self.tableau_root = None
+
+    def solve_under_assumptions(self, assumptions: Valuation) -> bool:
+        self.push()
+        try:
+            self.add_assumptions(assumptions)
+            return self.solve()
+        finally:
+            self.pop()
+
+    def witness(self) -> Optional[WitnessNode]:
+        if self.tableau_root is None or self.tableau_root.status != Open:
+            return None
+        return self.tableau_root.witness
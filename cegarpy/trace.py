@@ -0,0 +1,148 @@
+import argparse
+import struct
+import sys
+import time
+from typing import Dict, List, Iterator, NamedTuple, Optional, BinaryIO, Any, Iterable, Tuple
+
+from cegarpy.formula import Formula
+
+LOCAL: int = 0
+JUMP: int = 1
+RESTART: int = 2
+CLOSE: int = 3
+OPEN: int = 4
+EVENT_NAMES: Tuple[str, ...] = ('local', 'jump', 'restart', 'close', 'open')
+
+MAGIC: bytes = b'CGTR'
+VERSION: int = 1
+HEADER = struct.Struct('<4sHH')
+RECORD = struct.Struct('<BBHIQ')
+
+
+class TraceRecord(NamedTuple):
+    event: int
+    depth: int
+    clause_id: int
+    timestamp: int
+
+    @property
+    def name(self) -> str:
+        return EVENT_NAMES[self.event]
+
+
+class Tracer:
+
+    def __init__(self, path: str, sample: int = 1, buffer_records: int = 4096) -> None:
+        if sample < 1:
+            raise ValueError("Sample rate must be positive")
+        self.path: str = path
+        self.sample: int = sample
+        self.events: int = 0
+        self.records: int = 0
+        self._file: BinaryIO = open(path, 'wb')  # pylint: disable=consider-using-with
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        self._buffer: bytearray = bytearray(RECORD.size * buffer_records)
+        self._offset: int = 0
+        self._start: int = time.perf_counter_ns()
+        self._by_identity: Dict[int, int] = {}
+        self._by_value: Dict[Formula, int] = {}
+        self._subjects: List[Formula] = []
+
+    def __enter__(self) -> 'Tracer':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def clause_id(self, subject: Optional[Formula]) -> int:
+        if subject is None:
+            return 0
+        clause_id = self._by_identity.get(id(subject))
+        if clause_id is None:
+            clause_id = self._by_value.get(subject)
+            if clause_id is None:
+                clause_id = len(self._by_value) + 1
+                self._by_value[subject] = clause_id
+            self._by_identity[id(subject)] = clause_id
+            self._subjects.append(subject)
+        return clause_id
+
+    def emit(self, event: int, depth: int, subject: Optional[Formula] = None) -> None:
+        self.events += 1
+        if self.events % self.sample:
+            return
+        RECORD.pack_into(self._buffer, self._offset, event, 0, min(depth, 0xFFFF), self.clause_id(subject),
+                         time.perf_counter_ns() - self._start)
+        self._offset += RECORD.size
+        self.records += 1
+        if self._offset == len(self._buffer):
+            self.flush()
+
+    def flush(self) -> None:
+        self._file.write(memoryview(self._buffer)[:self._offset])
+        self._offset = 0
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+        with open(f"{self.path}.clauses", 'w', encoding='utf-8') as table:
+            table.writelines(f"{clause_id}\t{subject}\n" for subject, clause_id in self._by_value.items())
+
+
+def read_trace(path: str) -> Iterator[TraceRecord]:
+    with open(path, 'rb') as file:
+        data = file.read()
+    magic, version, record_size = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise ValueError(f"{path} is not a version {VERSION} trace")
+    body = memoryview(data)[HEADER.size:]
+    usable = len(body) - len(body) % RECORD.size
+    for event, _, depth, clause_id, timestamp in RECORD.iter_unpack(body[:usable]):
+        yield TraceRecord(event, depth, clause_id, timestamp)
+
+
+def read_clause_table(path: str) -> Dict[int, str]:
+    with open(f"{path}.clauses", encoding='utf-8') as table:
+        return {int(clause_id): subject for clause_id, subject in
+                (line.rstrip('\n').split('\t', 1) for line in table)}
+
+
+def timeline(records: Iterable[TraceRecord]) -> Dict[int, List[TraceRecord]]:
+    result: Dict[int, List[TraceRecord]] = {}
+    for record in records:
+        result.setdefault(record.depth, []).append(record)
+    return result
+
+
+def folded(records: Iterable[TraceRecord]) -> Dict[str, int]:
+    stacks: Dict[str, int] = {}
+    previous: Optional[TraceRecord] = None
+    for record in records:
+        if previous is not None:
+            stack = ';'.join([f"depth {depth}" for depth in range(previous.depth + 1)] + [previous.name])
+            stacks[stack] = stacks.get(stack, 0) + (record.timestamp - previous.timestamp) // 1000
+        previous = record
+    return stacks
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m cegarpy.trace', description="Summarise a tableau trace")
+    parser.add_argument('trace')
+    parser.add_argument('--folded', action='store_true', help="print flame-graph folded stacks (microseconds)")
+    arguments = parser.parse_args(argv)
+    records = list(read_trace(arguments.trace))
+    if arguments.folded:
+        for stack, weight in sorted(folded(records).items()):
+            print(f"{stack} {weight}")
+        return 0
+    for depth, depth_records in sorted(timeline(records).items()):
+        print(f"depth {depth}: " + ' '.join(f"{record.timestamp // 1000}us:{record.name}#{record.clause_id}"
+                                            for record in depth_records))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
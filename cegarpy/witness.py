@@ -0,0 +1,38 @@
+from typing import Mapping, Tuple, Any, Iterator, Set
+
+from frozendict import frozendict
+
+from cegarpy.atom import Atom
+
+
+class WitnessNode:
+    __slots__ = ('valuation', 'successors', '_hash')
+
+    def __init__(self, valuation: Mapping[Atom, bool], successors: Tuple['WitnessNode', ...] = ()) -> None:
+        self.valuation: Mapping[Atom, bool] = frozendict(valuation)
+        self.successors: Tuple['WitnessNode', ...] = successors
+        self._hash: int = hash((self.valuation, successors))
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, WitnessNode) or self._hash != other._hash:
+            return False
+        return self.valuation == other.valuation and self.successors == other.successors
+
+    def __iter__(self) -> Iterator['WitnessNode']:
+        seen: Set[int] = set()
+        pending = [self]
+        while pending:
+            node = pending.pop()
+            if id(node) not in seen:
+                seen.add(id(node))
+                yield node
+                pending.extend(reversed(node.successors))
+
+    @property
+    def atoms(self) -> Set[Atom]:
+        return {atom for node in self for atom in node.valuation}
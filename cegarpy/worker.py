@@ -0,0 +1,108 @@
+import asyncio
+import atexit
+import multiprocessing
+import os
+import threading
+from collections import deque
+from functools import partial
+from multiprocessing.pool import Pool
+from typing import Optional, Dict, Tuple, Any, Callable, Deque, List
+
+# Worker processes are started with the 'spawn' method, which re-imports the caller's main module in every worker: a
+# script that solves in a WorkerPool must guard its entry point with `if __name__ == '__main__':`.
+
+Job = Tuple[Callable[..., Any], Tuple[Any, ...], asyncio.AbstractEventLoop, asyncio.Future]
+
+
+class WorkerPool:
+
+    def __init__(self, processes: Optional[int] = None) -> None:
+        self.processes: int = processes or os.cpu_count() or 1
+        self._lock = threading.Lock()
+        # Every worker is a pool of one process, so a cancelled job can be killed without touching the others.
+        self._idle: List[Pool] = []
+        self._running: Dict[int, Pool] = {}
+        self._queue: Deque[int] = deque()
+        self._jobs: Dict[int, Job] = {}
+        self._next: int = 0
+
+    @property
+    def workers(self) -> int:
+        return len(self._idle) + len(self._running)
+
+    def _dispatch(self) -> None:
+        while self._queue and (self._idle or self.workers < self.processes):
+            job = self._queue.popleft()
+            worker = self._idle.pop() if self._idle else multiprocessing.get_context('spawn').Pool(1)
+            self._running[job] = worker
+            function, args, loop, _ = self._jobs[job]
+            worker.apply_async(function, args, callback=partial(self._notify, job, loop, False),
+                               error_callback=partial(self._notify, job, loop, True))
+
+    def _notify(self, job: int, loop: asyncio.AbstractEventLoop, failed: bool, value: Any) -> None:
+        try:
+            loop.call_soon_threadsafe(self._resolve, job, failed, value)
+        except RuntimeError:
+            self._release(job)
+
+    def _release(self, job: int) -> Optional[Job]:
+        with self._lock:
+            worker = self._running.pop(job, None)
+            if worker is not None:
+                self._idle.append(worker)
+            pending = self._jobs.pop(job, None)
+            self._dispatch()
+        return pending
+
+    def _resolve(self, job: int, failed: bool, value: Any) -> None:
+        pending = self._release(job)
+        if pending is None or pending[3].done():
+            return
+        if failed:
+            pending[3].set_exception(value)
+        else:
+            pending[3].set_result(value)
+
+    def _cancel(self, job: int) -> None:
+        with self._lock:
+            if self._jobs.pop(job, None) is None:
+                return
+            worker = self._running.pop(job, None)
+            if worker is None:
+                self._queue.remove(job)
+                return
+            worker.terminate()
+            self._dispatch()
+
+    async def run(self, function: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            job = self._next
+            self._next += 1
+            self._jobs[job] = (function, args, loop, future)
+            self._queue.append(job)
+            self._dispatch()
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            self._cancel(job)
+            raise
+
+    def close(self) -> None:
+        with self._lock:
+            for worker in (*self._idle, *self._running.values()):
+                worker.terminate()
+            self._idle = []
+            self._running = {}
+
+
+_default: Optional[WorkerPool] = None
+
+
+def default_pool() -> WorkerPool:
+    global _default  # pylint: disable=global-statement
+    if _default is None:
+        _default = WorkerPool()
+        atexit.register(_default.close)
+    return _default
@@ -0,0 +1,85 @@
+import random
+from itertools import product
+
+from frozendict import frozendict
+
+from cegarpy.atom import Atom
+from cegarpy.formula import Formula, Literal, Conjunction, Disjunction, Implication, Equivalence, Negation, Clause, \
+    ConjunctiveClause, Box, Dia, BoxChain, FrozenValuation
+
+A1 = Literal(Atom('a1'))
+B1 = Literal(Atom('b1'))
+A2 = Literal(Atom('a2'))
+C1 = Literal(Atom('c1'))
+P = Literal(Atom('p'))
+Q = Literal(Atom('q'))
+
+EXAMPLE_MODAL_FORMULAE = BoxChain((
+    ConjunctiveClause(frozenset({Implication(A1, Box(B1)), Implication(A2, Box(P)), Implication(C1, Dia(-Q))})),
+    ConjunctiveClause(frozenset({Implication(B1, Disjunction(-P, Q))}))
+))
+EXAMPLE_CLOSED = ConjunctiveClause(frozenset({A1, A2, C1}))
+EXAMPLE_OPEN = ConjunctiveClause(frozenset({A1, C1}))
+
+
+def random_formula(rng: random.Random, atoms: list, depth: int) -> Formula:
+    if depth == 0 or rng.random() < 0.2:
+        return Literal(rng.choice(atoms), rng.random() < 0.5)
+    connective = rng.choice([Conjunction, Disjunction, Implication, Equivalence, Negation])
+    if connective is Negation:
+        return Negation(random_formula(rng, atoms, depth - 1))
+    return connective(random_formula(rng, atoms, depth - 1), random_formula(rng, atoms, depth - 1))
+
+
+def random_problem(rng: random.Random, depth: int):
+    atoms = [Atom(f"x{i}") for i in range(4)]
+
+    def lit():
+        return Literal(rng.choice(atoms), rng.random() < 0.5)
+
+    classic_formulae = ConjunctiveClause(frozenset(Clause(frozenset({lit(), lit()})) for _ in range(rng.randint(1, 5))))
+    levels = []
+    for d in range(depth):
+        formulae = set()
+        for _ in range(rng.randint(2, 7)):
+            kind = rng.random()
+            if kind < 0.4:
+                formulae.add(Implication(lit(), Box(Clause(frozenset({lit()})))))
+            elif kind < 0.8:
+                formulae.add(Implication(lit(), Dia(lit())))
+            elif d > 0:
+                formulae.add(Implication(lit(), Clause(frozenset({lit(), lit()}))))
+        levels.append(ConjunctiveClause(frozenset(formulae)))
+    return classic_formulae, BoxChain(tuple(levels))
+
+
+def brute_force(classic_formulae, modal_formulae, assumptions=()):
+    # Independent K oracle: try every valuation of every world, depth by depth.
+    atoms = sorted(classic_formulae.atoms.union(*(isf.atoms for isf in modal_formulae.formula_sequence),
+                                                *(isf.atoms for isf in assumptions)))
+    valuations = [FrozenValuation(frozendict(zip(atoms, values)))
+                  for values in product((False, True), repeat=len(atoms))]
+    levels = modal_formulae.formula_sequence
+    cache = {}
+
+    def satisfiable(depth, required):
+        key = depth, required
+        if key not in cache:
+            level = levels[depth].formulae if depth < len(levels) else frozenset()
+            cache[key] = any(world(depth, level, required, valuation) for valuation in valuations)
+        return cache[key]
+
+    def world(depth, level, required, valuation):
+        if not all(isf.evaluate(valuation) for isf in required):
+            return False
+        boxes = frozenset(isf.right.formula for isf in level
+                          if isinstance(isf.right, Box) and isf.left.evaluate(valuation))
+        for isf in level:
+            if isinstance(isf.right, Dia):
+                if isf.left.evaluate(valuation) and not satisfiable(depth + 1, boxes | {isf.right.formula}):
+                    return False
+            elif not isinstance(isf.right, Box) and not isf.evaluate(valuation):
+                return False
+        return True
+
+    return satisfiable(0, frozenset(classic_formulae.formulae) | frozenset(assumptions))
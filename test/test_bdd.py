@@ -0,0 +1,161 @@
+import random
+import unittest
+
+from cegarpy.atom import Atom
+from cegarpy.bdd import Bdd, BddOverflow, BddSolver, TRUE, FALSE
+from cegarpy.formula import Literal, Clause, Conjunction, Disjunction, Implication, Negation, ConjunctiveClause, \
+    MutableValuation, FrozenValuation, models
+from cegarpy.tableau import ModalTableau
+from test.problems import EXAMPLE_MODAL_FORMULAE, EXAMPLE_CLOSED, random_formula
+
+
+class TestBdd(unittest.TestCase):
+
+    def test_canonical(self):
+        p = Literal(Atom('p'))
+        q = Literal(Atom('q'))
+        bdd = Bdd()
+
+        expected = bdd.compile(Negation(Conjunction(p, q)))
+        actual = bdd.compile(Disjunction(-p, -q))
+
+        self.assertEqual(expected, actual)
+
+    def test_tautology(self):
+        p = Literal(Atom('p'))
+        bdd = Bdd()
+
+        self.assertEqual(TRUE, bdd.compile(Disjunction(p, -p)))
+        self.assertEqual(FALSE, bdd.compile(Conjunction(p, -p)))
+
+    def test_order(self):
+        atoms = [Atom('a'), Atom('b')]
+        bdd = Bdd(order=list(reversed(atoms)))
+
+        bdd.compile(Conjunction(Literal(atoms[0]), Literal(atoms[1])))
+
+        expected = [Atom('b'), Atom('a')]
+        actual = bdd.order
+
+        self.assertListEqual(expected, actual)
+
+    def test_count(self):
+        rng = random.Random(0)
+        atoms = [Atom(f"x{i}") for i in range(5)]
+        for _ in range(50):
+            f = random_formula(rng, atoms, 4)
+            bdd = Bdd(cache_size=8)
+
+            expected = sum(1 for _ in models(f, set(atoms)))
+            actual = bdd.count(bdd.compile(f), atoms)
+
+            self.assertEqual(expected, actual)
+
+    def test_count_rejects_partial_alphabet(self):
+        p = Atom('p')
+        q = Atom('q')
+        bdd = Bdd()
+        node = bdd.compile(Conjunction(Literal(p), Literal(q)))
+
+        with self.assertRaises(ValueError):
+            bdd.count(node, [p])
+        self.assertEqual(2, bdd.count(node, [p, q, Atom('r')]))
+
+    def test_chain(self):
+        atoms = [Atom(f"x{i}") for i in range(1500)]
+        chain = ConjunctiveClause(frozenset(Clause(frozenset({Literal(atoms[i]), Literal(atoms[i + 1])}))
+                                            for i in range(len(atoms) - 1)))
+        bdd = Bdd()
+        node = bdd.compile(chain)
+        fibonacci = [1, 2]
+        while len(fibonacci) <= len(atoms):
+            fibonacci.append(fibonacci[-1] + fibonacci[-2])
+
+        self.assertListEqual(atoms, bdd.order)
+        self.assertLess(len(bdd), 4 * len(atoms))
+        self.assertEqual(fibonacci[len(atoms)], bdd.count(node, atoms))
+        self.assertEqual(FALSE, bdd.restrict(node, {atoms[0]: False, atoms[1]: False}))
+
+    def test_max_nodes(self):
+        atoms = [Atom(f"x{i}") for i in range(8)]
+        bdd = Bdd(max_nodes=16)
+
+        with self.assertRaises(BddOverflow):
+            bdd.compile(ConjunctiveClause(frozenset(Disjunction(Literal(a), Literal(b)) for a in atoms for b in atoms
+                                                    if a != b)))
+        self.assertLessEqual(len(bdd), 16)
+
+    def test_restrict_pick(self):
+        p = Atom('p')
+        q = Atom('q')
+        bdd = Bdd()
+        node = bdd.compile(Implication(Literal(p), Literal(q)))
+
+        expected = {q: True}
+        actual = bdd.pick(bdd.restrict(node, {p: True}))
+
+        self.assertDictEqual(expected, actual)
+
+    def test_cache_eviction(self):
+        atoms = [Atom(f"x{i}") for i in range(8)]
+        bdd = Bdd(cache_size=4)
+
+        bdd.compile(ConjunctiveClause(frozenset(Disjunction(Literal(a), Literal(b)) for a in atoms for b in atoms)))
+
+        self.assertLessEqual(len(bdd.cache), 4)
+
+
+class TestBddSolver(unittest.TestCase):
+
+    def test_assumptions(self):
+        p = Atom('p')
+        q = Atom('q')
+        solver = BddSolver()
+        clauses = ConjunctiveClause(frozenset({Disjunction(Literal(p), Literal(q))}))
+
+        self.assertTrue(solver.solve_under_assumptions(clauses, MutableValuation({p: True})))
+        self.assertEqual(FrozenValuation.from_atoms({p}), solver.model())
+        self.assertFalse(solver.solve_under_assumptions(clauses, MutableValuation({p: False, q: False})))
+        self.assertEqual(frozenset({Literal(p, False), Literal(q, False)}), solver.core())
+        self.assertEqual(1, len(solver.compiled))
+
+    def test_bounded(self):
+        rng = random.Random(2)
+        atoms = [Atom(f"x{i}") for i in range(8)]
+        clauses = ConjunctiveClause(frozenset(random_formula(rng, atoms, 4) for _ in range(4)))
+        solver = BddSolver(max_nodes=64, max_compiled=2)
+        for _ in range(64):
+            assumptions = MutableValuation({atom: rng.random() < 0.5 for atom in rng.sample(atoms, 3)})
+
+            expected = any(models(clauses, set(atoms), assumptions))
+            actual = solver.solve_under_assumptions(clauses, assumptions)
+
+            self.assertEqual(expected, actual)
+            self.assertLessEqual(len(solver.compiled), 2)
+        self.assertLessEqual(len(solver.bdd), 64)
+
+    def test_fallback(self):
+        rng = random.Random(3)
+        atoms = [Atom(f"x{i}") for i in range(8)]
+        solver = BddSolver(max_nodes=8)
+        for _ in range(32):
+            clauses = ConjunctiveClause(frozenset(random_formula(rng, atoms, 4) for _ in range(4)))
+
+            expected = any(models(clauses, set(atoms)))
+            actual = solver.solve(clauses)
+
+            self.assertEqual(expected, actual)
+            if actual:
+                model = solver.model()
+                assert model is not None
+                self.assertTrue(clauses.evaluate(MutableValuation({atom: model.assignment(atom) for atom in atoms})))
+        self.assertGreater(solver.fallbacks, 0)
+        self.assertLessEqual(len(solver.bdd), 8)
+
+    def test_tableau(self):
+        m = ModalTableau(EXAMPLE_CLOSED, EXAMPLE_MODAL_FORMULAE, local_solver=BddSolver())
+
+        expected = False
+        actual = m.solve()
+
+        self.assertEqual(expected, actual)
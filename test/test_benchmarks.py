@@ -0,0 +1,50 @@
+import unittest
+
+from benchmarks.families import FAMILIES
+from benchmarks.micro import CASES, measure as measure_micro
+from benchmarks.run import measure, compare
+from cegarpy.kripke import extract_witness, validate_witness
+
+
+class TestFamilies(unittest.TestCase):
+
+    def test_expected(self):
+        for family, generator in FAMILIES.items():
+            for size in (1, 2, 3):
+                for satisfiable in (True, False):
+                    with self.subTest(family=family, size=size, satisfiable=satisfiable):
+                        problem = generator(size, satisfiable)
+                        m = problem.tableau()
+
+                        self.assertEqual(satisfiable, m.solve())
+                        if satisfiable:
+                            self.assertTrue(validate_witness(m, extract_witness(m)))
+
+
+class TestRun(unittest.TestCase):
+
+    def test_compare(self):
+        result = measure(FAMILIES['path'](2, False), repeat=1)
+        baseline = {'results': [dict(result, seconds=result['seconds'] / 10)]}
+
+        self.assertTrue(result['result'] is False)
+        self.assertGreater(result['statistics']['restart'], 0)
+        self.assertListEqual([], compare({'results': [result]}, {'results': [result]}, noise=0))
+        self.assertEqual(1, len(compare({'results': [result]}, baseline, noise=0)))
+
+
+class TestMicro(unittest.TestCase):
+
+    def test_cases(self):
+        for case in CASES:
+            with self.subTest(case=case.key):
+                case.setup(case.size)()
+
+    def test_measure(self):
+        case = next(case for case in CASES if case.name == 'literal')
+
+        result = measure_micro(case, repeat=1)
+
+        self.assertEqual(case.key, result['case'])
+        self.assertGreater(result['ns'], 0)
+        self.assertGreater(result['blocks'], 0)
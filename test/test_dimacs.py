@@ -0,0 +1,109 @@
+import io
+import sys
+import unittest
+
+from frozendict import frozendict
+
+from cegarpy.atom import Atom
+from cegarpy.dimacs import DimacsSolver, read_dimacs, write_dimacs
+from cegarpy.formula import Literal, ConjunctiveClause, Disjunction, MutableValuation, FrozenValuation
+from cegarpy.solver import LocalSolver, DpllSolver
+from cegarpy.stub_solver import main
+from cegarpy.tableau import ModalTableau
+from test.problems import EXAMPLE_MODAL_FORMULAE, EXAMPLE_CLOSED
+
+STUB = [sys.executable, '-m', 'cegarpy.stub_solver']
+WAITS_FOR_EOF = [sys.executable, '-c', 'import sys; sys.stdin.read()']
+SLEEPS = [sys.executable, '-c', 'import time; time.sleep(10)']
+
+
+class TestDimacs(unittest.TestCase):
+
+    def test_roundtrip(self):
+        stream = io.StringIO()
+        write_dimacs(stream, 3, [(1, -2), (3,)])
+
+        expected = [('p', [3, 2]), ('clause', [1, -2]), ('clause', [3])]
+        actual = list(read_dimacs(stream.getvalue().splitlines()))
+
+        self.assertListEqual(expected, actual)
+
+    def test_stub_one_shot(self):
+        stdout = io.StringIO()
+
+        expected = 20
+        actual = main(io.StringIO("p cnf 1 2\n1 0\n-1 0\n"), stdout)
+
+        self.assertEqual(expected, actual)
+        self.assertEqual("s UNSATISFIABLE\n", stdout.getvalue())
+
+    def test_stub_incremental(self):
+        stdout = io.StringIO()
+
+        main(io.StringIO("p cnf 2 1\n1 2 0\na -1 -2 0\np cnf 2 1\n1 2 0\na -1 0\n"), stdout)
+
+        expected = ["s UNSATISFIABLE", "f -1 -2 0", "s SATISFIABLE", "v -1 2 0"]
+        actual = stdout.getvalue().splitlines()
+
+        self.assertListEqual(expected, actual)
+
+
+class TestDimacsSolver(unittest.TestCase):
+
+    def test_protocol(self):
+        self.assertIsInstance(DimacsSolver(STUB), LocalSolver)
+        self.assertIsInstance(DpllSolver(), LocalSolver)
+
+    def test_reuse(self):
+        p = Atom('p')
+        q = Atom('q')
+        clauses = ConjunctiveClause(frozenset({Disjunction(Literal(p), Literal(q))}))
+        with DimacsSolver(STUB, incremental=True) as solver:
+            self.assertTrue(solver.solve_under_assumptions(clauses, MutableValuation({p: False})))
+            process = solver._process
+            self.assertEqual(FrozenValuation(frozendict({p: False, q: True})), solver.model())
+            self.assertFalse(solver.solve_under_assumptions(clauses, MutableValuation({p: False, q: False})))
+            self.assertEqual(frozenset({Literal(p, False), Literal(q, False)}), solver.core())
+            self.assertIs(process, solver._process)
+        self.assertIsNone(solver._process)
+
+    def test_one_shot(self):
+        p = Atom('p')
+        clauses = ConjunctiveClause(frozenset({Literal(p)}))
+        solver = DimacsSolver(STUB)
+
+        self.assertTrue(solver.solve(clauses))
+        self.assertEqual(FrozenValuation.from_atoms({p}), solver.model())
+        self.assertFalse(solver.solve_under_assumptions(clauses, MutableValuation({p: False})))
+
+    def test_unrelated_assumptions(self):
+        p = Atom('p')
+        clauses = ConjunctiveClause(frozenset({Literal(p)}))
+        solver = DpllSolver()
+
+        self.assertTrue(solver.solve_under_assumptions(clauses, MutableValuation({Atom('q'): True})))
+        self.assertEqual(FrozenValuation(frozendict({p: True, Atom('q'): True})), solver.model())
+        self.assertEqual(1, solver.encodings[clauses].num_variables)
+
+    def test_handshake(self):
+        clauses = ConjunctiveClause(frozenset({Literal(Atom('p'))}))
+        with DimacsSolver(WAITS_FOR_EOF, incremental=True, handshake_timeout=0.5) as solver:
+            with self.assertRaises(RuntimeError):
+                solver.solve(clauses)
+            self.assertIsNone(solver._process)
+
+    def test_timeout(self):
+        clauses = ConjunctiveClause(frozenset({Literal(Atom('p'))}))
+        solver = DimacsSolver(SLEEPS, timeout=0.5)
+
+        with self.assertRaises(TimeoutError):
+            solver.solve(clauses)
+
+    def test_tableau(self):
+        with DimacsSolver(STUB, incremental=True) as solver:
+            m = ModalTableau(EXAMPLE_CLOSED, EXAMPLE_MODAL_FORMULAE, local_solver=solver)
+
+            expected = False
+            actual = m.solve()
+
+        self.assertEqual(expected, actual)
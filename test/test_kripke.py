@@ -0,0 +1,124 @@
+import random
+import unittest
+
+import numpy as np
+
+from cegarpy.atom import Atom
+from cegarpy.formula import Literal, ConjunctiveClause, Clause, BoxChain, Implication, Box, Dia, Disjunction, \
+    Negation, Top, Bot, FrozenValuation, MutableValuation
+from cegarpy.kripke import KripkeStructure, ModelChecker, extract_witness, validate_witness
+from cegarpy.tableau import ModalTableau
+from test.problems import EXAMPLE_MODAL_FORMULAE, EXAMPLE_OPEN, random_problem, brute_force
+
+
+class TestKripkeStructure(unittest.TestCase):
+
+    def test_from_edges(self):
+        p = Atom('p')
+        k = KripkeStructure.from_edges([p], [[True], [False], [True]], [(0, 2), (0, 1), (2, 2)])
+
+        self.assertListEqual([0, 2, 2, 3], k.indptr.tolist())
+        self.assertListEqual([1, 2, 2], k.indices.tolist())
+        self.assertListEqual([1, 2], k.successors(0).tolist())
+        self.assertEqual(FrozenValuation.from_atoms({p}), k.valuation(2))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            KripkeStructure([Atom('p')], [[True]], [0, 1], [3])
+
+
+class TestModelChecker(unittest.TestCase):
+
+    def setUp(self):
+        self.p_ = Atom('p')
+        self.p = Literal(self.p_)
+        self.k = KripkeStructure.from_edges([self.p_], [[True], [False], [True]], [(0, 1), (0, 2), (1, 2)])
+        self.checker = ModelChecker(self.k)
+
+    def test_modal(self):
+        self.assertListEqual([False, True, True], self.checker.check(Box(self.p)).tolist())
+        self.assertListEqual([True, True, False], self.checker.check(Dia(self.p)).tolist())
+        self.assertListEqual([True, False, False], self.checker.check(Dia(Negation(self.p))).tolist())
+
+    def test_classic(self):
+        self.assertListEqual([True, True, True], self.checker.check(Disjunction(self.p, -self.p)).tolist())
+        self.assertListEqual([True, True, True], self.checker.check(Top()).tolist())
+        self.assertListEqual([False, False, False], self.checker.check(Bot()).tolist())
+        self.assertListEqual([False, True, False],
+                             self.checker.check(Clause(frozenset({-self.p, Bot()}))).tolist())
+
+    def test_box_chain(self):
+        chain = BoxChain((ConjunctiveClause(frozenset({self.p})), ConjunctiveClause(frozenset({Top()})),
+                          ConjunctiveClause(frozenset({self.p}))))
+
+        expected = [True, False, True]
+        actual = self.checker.check(chain).tolist()
+
+        self.assertListEqual(expected, actual)
+
+    def test_vectorized(self):
+        rng = np.random.default_rng(0)
+        atoms = [Atom('p')]
+        n = 1000
+        edges = [(int(a), int(b)) for a, b in rng.integers(0, n, size=(5000, 2))]
+        k = KripkeStructure.from_edges(atoms, rng.random((n, 1)) < 0.5, edges)
+        actual = ModelChecker(k).check(Box(Literal(atoms[0])))
+        expected = [all(k.valuations[w, 0] for w in k.successors(v)) for v in range(n)]
+
+        self.assertListEqual(expected, actual.tolist())
+
+
+class TestWitness(unittest.TestCase):
+
+    def test_example(self):
+        m = ModalTableau(EXAMPLE_OPEN, EXAMPLE_MODAL_FORMULAE)
+
+        self.assertTrue(m.solve())
+        k = extract_witness(m)
+
+        self.assertEqual(2, k.num_worlds)
+        self.assertTrue(validate_witness(m, k))
+
+    def test_closed(self):
+        p = Literal(Atom('p'))
+        m = ModalTableau(ConjunctiveClause(frozenset({p, -p})))
+
+        self.assertFalse(m.solve())
+        with self.assertRaises(ValueError):
+            extract_witness(m)
+
+    def test_random(self):
+        rng = random.Random(3)
+        for _ in range(60):
+            classic_formulae, modal_formulae = random_problem(rng, rng.randint(1, 3))
+            m = ModalTableau(classic_formulae, modal_formulae)
+            if m.solve():
+                self.assertTrue(validate_witness(m, extract_witness(m)))
+
+    def test_random_oracle(self):
+        rng = random.Random(1)
+        for _ in range(300):
+            classic_formulae, modal_formulae = random_problem(rng, rng.randint(1, 3))
+
+            sign = rng.random() < 0.5
+
+            expected = brute_force(classic_formulae, modal_formulae, {Literal(Atom('x0'), sign)})
+            actual = ModalTableau(classic_formulae, modal_formulae, MutableValuation({Atom('x0'): sign})).solve()
+
+            self.assertEqual(expected, actual, f"{classic_formulae} {modal_formulae}")
+
+    def test_dia_literal_is_local(self):
+        c = Literal(Atom('c'))
+        q = Literal(Atom('q'))
+        r = Literal(Atom('r'))
+        classic_formulae = ConjunctiveClause(frozenset({c}))
+        modal_formulae = BoxChain((
+            ConjunctiveClause(frozenset({Implication(c, Dia(q))})),
+            ConjunctiveClause(frozenset({Implication(q, Dia(r))})),
+            ConjunctiveClause(frozenset({Implication(r, Clause(frozenset({-q})))})),
+        ))
+
+        self.assertTrue(brute_force(classic_formulae, modal_formulae))
+        m = ModalTableau(classic_formulae, modal_formulae)
+        self.assertTrue(m.solve())
+        self.assertTrue(validate_witness(m, extract_witness(m)))
@@ -0,0 +1,114 @@
+import unittest
+
+from cegarpy.atom import Atom
+from cegarpy.formula import Literal, ConjunctiveClause, Implication, Box, Dia, Disjunction, MutableValuation
+from cegarpy.relevance import relevance_index, components
+from cegarpy.tableau import LocalNode, ModalTableau
+from test.problems import EXAMPLE_MODAL_FORMULAE, EXAMPLE_OPEN
+
+
+class TestComponents(unittest.TestCase):
+
+    def test_independent(self):
+        p = Literal(Atom('p'))
+        q = Literal(Atom('q'))
+        r = Literal(Atom('r'))
+
+        clauses = ConjunctiveClause(frozenset({Disjunction(p, q), Disjunction(-q, p), r}))
+
+        expected = {frozenset({Atom('p'), Atom('q')}), frozenset({Atom('r')})}
+        actual = {atoms for _, atoms in components(clauses)}
+
+        self.assertSetEqual(expected, actual)
+
+    def test_transitive(self):
+        p = Literal(Atom('p'))
+        q = Literal(Atom('q'))
+        r = Literal(Atom('r'))
+
+        clauses = ConjunctiveClause(frozenset({Disjunction(p, q), Disjunction(q, r)}))
+
+        expected = 1
+        actual = len(components(clauses))
+
+        self.assertEqual(expected, actual)
+
+
+class TestRelevanceIndex(unittest.TestCase):
+
+    def test_obligations(self):
+        a = Literal(Atom('a'))
+        b = Literal(Atom('b'))
+        c = Literal(Atom('c'))
+        box = Implication(a, Box(b))
+        dia = Implication(c, Dia(-b))
+
+        index = relevance_index(frozenset({box}), frozenset({dia}))
+
+        expected = {Atom('a'): frozenset({box}), Atom('c'): frozenset({dia})}
+        actual = dict(index.obligations)
+
+        self.assertDictEqual(expected, actual)
+
+    def test_slice(self):
+        a = Literal(Atom('a'))
+        b = Literal(Atom('b'))
+        p = Literal(Atom('p'))
+        q = Literal(Atom('q'))
+        index = relevance_index(frozenset({Implication(a, Box(b))}), frozenset())
+        clauses = ConjunctiveClause(frozenset({Disjunction(a, p), Disjunction(q, -q)}))
+
+        relevant, irrelevant = index.slice(clauses, MutableValuation())
+
+        self.assertEqual([ConjunctiveClause(frozenset({Disjunction(a, p)}))], relevant)
+        self.assertEqual([ConjunctiveClause(frozenset({Disjunction(q, -q)}))], irrelevant)
+
+
+class TestLocal(unittest.TestCase):
+
+    def test_irrelevant_atoms_unassigned(self):
+        a = Literal(Atom('a'))
+        b = Literal(Atom('b'))
+        p = Literal(Atom('p'))
+        q = Literal(Atom('q'))
+        node = LocalNode(clauses=ConjunctiveClause(frozenset({a, Disjunction(p, q)})),
+                         box_implications={Implication(a, Box(b))})
+
+        node.local()
+
+        assert node.model is not None
+        expected = {Atom('a')}
+        actual = set(node.model.alphabet)
+
+        self.assertSetEqual(expected, actual)
+
+    def test_irrelevant_unsatisfiable(self):
+        a = Literal(Atom('a'))
+        b = Literal(Atom('b'))
+        p = Literal(Atom('p'))
+        node = LocalNode(clauses=ConjunctiveClause(frozenset({a, p, -p})),
+                         box_implications={Implication(a, Box(b))})
+
+        node.local()
+
+        expected = 'Closed'
+        actual = node.status
+
+        self.assertEqual(expected, actual)
+
+    def test_index_per_level(self):
+        m = ModalTableau(EXAMPLE_OPEN, EXAMPLE_MODAL_FORMULAE)
+
+        self.assertTrue(m.solve())
+        assert m.context is not None and m.tableau_root is not None
+        nodes = [m.tableau_root]
+        for node in nodes:
+            if node.child is not None:
+                nodes.extend(node.child.jump_nodes or ())
+                if node.child.restart_node is not None:
+                    nodes.append(node.child.restart_node)
+        indices = {id(node.relevance) for node in nodes if node.depth > 0}
+        expected = {id(index) for *_, index in m.context.levels.values()}
+
+        self.assertGreater(len(nodes), 1)
+        self.assertSetEqual(expected, indices)
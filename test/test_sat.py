@@ -0,0 +1,140 @@
+import random
+import unittest
+
+from cegarpy.atom import Atom
+from cegarpy.formula import Literal, Conjunction, Disjunction, Negation, Bot, Top, Box, ConjunctiveClause, Clause, \
+    FrozenValuation, MutableValuation, models as powerset_models
+from cegarpy.sat import models, count_models, solve
+from test.problems import random_formula
+
+
+class TestSolve(unittest.TestCase):
+
+    def test_satisfiable(self):
+        expected = {1: True, 2: False}
+        actual = solve([(1, 2), (-2,)])
+
+        self.assertEqual(expected, actual)
+
+    def test_unsatisfiable(self):
+        expected = None
+        actual = solve([(1, 2), (-1, 2)], assumptions=[-2])
+
+        self.assertEqual(expected, actual)
+
+
+class TestModels(unittest.TestCase):
+
+    def test_disjunction(self):
+        p = Atom('p')
+        q = Atom('q')
+
+        d = Disjunction(Literal(p), Literal(q))
+
+        expected = {FrozenValuation.from_atoms({p}), FrozenValuation.from_atoms({q}),
+                    FrozenValuation.from_atoms({p, q})}
+        actual = set(models(d))
+
+        self.assertSetEqual(expected, actual)
+
+    def test_valuation(self):
+        p = Atom('p')
+        q = Atom('q')
+
+        d = Disjunction(Literal(p), Literal(q))
+
+        expected = [FrozenValuation.from_atoms({p, q})]
+        actual = list(models(d, valuation=MutableValuation({q: True, p: True})))
+
+        self.assertListEqual(expected, actual)
+
+    def test_projection(self):
+        p = Atom('p')
+        q = Atom('q')
+
+        d = Disjunction(Literal(p), Literal(q))
+
+        expected = {FrozenValuation.from_atoms(set()), FrozenValuation.from_atoms({p})}
+        actual = set(models(d, alphabet={p}))
+
+        self.assertSetEqual(expected, actual)
+
+    def test_unconstrained_alphabet(self):
+        p = Atom('p')
+        q = Atom('q')
+
+        expected = {FrozenValuation.from_atoms({p}), FrozenValuation.from_atoms({p, q})}
+        actual = set(models(Literal(p), alphabet={p, q}))
+
+        self.assertSetEqual(expected, actual)
+
+    def test_constants(self):
+        p = Atom('p')
+
+        self.assertEqual([], list(models(Conjunction(Literal(p), Bot()))))
+        self.assertEqual([FrozenValuation.from_atoms({p})], list(models(Conjunction(Literal(p), Top()))))
+
+    def test_modal(self):
+        p = Atom('p')
+
+        with self.assertRaises(TypeError):
+            next(models(Box(Literal(p))))
+
+    def test_random(self):
+        rng = random.Random(0)
+        atoms = [Atom(f"x{i}") for i in range(5)]
+        for _ in range(50):
+            f = random_formula(rng, atoms, 4)
+
+            expected = set(powerset_models(f))
+            actual = set(models(f))
+
+            self.assertSetEqual(expected, actual)
+
+
+class TestCountModels(unittest.TestCase):
+
+    def test_random(self):
+        rng = random.Random(1)
+        atoms = [Atom(f"x{i}") for i in range(6)]
+        for _ in range(50):
+            f = random_formula(rng, atoms, 5)
+            alphabet = set(atoms)
+
+            expected = sum(1 for _ in powerset_models(f, alphabet))
+            actual = count_models(f, alphabet)
+
+            self.assertEqual(expected, actual)
+
+    def test_valuation(self):
+        p = Atom('p')
+        q = Atom('q')
+        r = Atom('r')
+
+        d = Disjunction(Literal(p), Literal(q))
+
+        expected = 4
+        actual = count_models(d, {p, q, r}, MutableValuation({p: True}))
+
+        self.assertEqual(expected, actual)
+
+    def test_projection(self):
+        p = Atom('p')
+        q = Atom('q')
+
+        c = Conjunction(Literal(p), Disjunction(Literal(q), Negation(Literal(q))))
+
+        expected = 1
+        actual = count_models(c, {p})
+
+        self.assertEqual(expected, actual)
+
+    def test_large(self):
+        atoms = [Atom(f"x{i}") for i in range(120)]
+        clauses = ConjunctiveClause(frozenset(
+            Clause(frozenset({Literal(atoms[i], False), Literal(atoms[i + 1], False)})) for i in range(0, 120, 2)))
+
+        expected = 3 ** 60
+        actual = count_models(clauses)
+
+        self.assertEqual(expected, actual)
@@ -0,0 +1,104 @@
+import os
+import pickle
+import random
+import tempfile
+import unittest
+
+from cegarpy.atom import Atom
+from cegarpy.formula import Literal, AtomicFormula, Bot, Top, Negation, Conjunction, Disjunction, Implication, \
+    Equivalence, Clause, ConjunctiveClause, Box, Dia, BoxChain, MutableValuation
+from cegarpy.serialize import dumps, loads, FormulaStore, dump_problems, dumps_problems
+from cegarpy.tableau import ModalTableau
+from test.problems import random_problem
+
+
+class TestSerialize(unittest.TestCase):
+
+    def test_roundtrip(self):
+        p = Atom('p')
+        q = Atom('q')
+        formulae = [
+            AtomicFormula(p),
+            Literal(q, False),
+            Bot(),
+            Top(),
+            Negation(Box(Dia(Literal(p)))),
+            Equivalence(Conjunction(Literal(p), Top()), Disjunction(Literal(q), Implication(Literal(p), Bot()))),
+            Clause(frozenset({Literal(p), Literal(q, False)})),
+            BoxChain((ConjunctiveClause(frozenset({Implication(Literal(p), Box(Literal(q)))})),
+                      ConjunctiveClause()))
+        ]
+
+        expected = formulae
+        actual = loads(dumps(formulae))
+
+        self.assertListEqual(expected, actual)
+
+    def test_deduplicates(self):
+        p = Literal(Atom('p'))
+        shared = p
+        for _ in range(12):
+            shared = Conjunction(shared, shared)
+
+        data = dumps([shared])
+
+        self.assertEqual([shared], loads(data))
+        self.assertLess(len(data), 200)
+        self.assertLess(len(data), len(pickle.dumps(shared)))
+
+    def test_deep(self):
+        formula = Literal(Atom('p'))
+        for _ in range(300):
+            formula = Box(formula)
+
+        expected = formula
+        actual = loads(dumps([formula]))[0]
+
+        self.assertEqual(expected, actual)
+
+    def test_rejects_foreign_buffer(self):
+        with self.assertRaises(ValueError):
+            loads(b'\x00' * 32)
+        with self.assertRaises(ValueError):
+            loads(b'CGPF')
+
+    def test_rejects_corrupt_buffer(self):
+        p = Literal(Atom('p'))
+        data = dumps([Conjunction(Negation(p), p)])
+        corruptions = [
+            data[:-1] + b'\x00',
+            data[:-1] + b'\x7f',
+            data[:-2],
+            data[:20],
+            data[:-5] + b'\x01\xff\xff\xff\x7f',
+        ]
+        for corrupt in corruptions:
+            with self.subTest(corrupt=corrupt), self.assertRaises(ValueError):
+                loads(corrupt)
+
+    def test_problems(self):
+        rng = random.Random(7)
+        tableaux = []
+        for _ in range(10):
+            classic_formulae, modal_formulae = random_problem(rng, 2)
+            tableaux.append(ModalTableau(classic_formulae, modal_formulae,
+                                         MutableValuation({Atom('a0'): rng.random() < 0.5})))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'problems.bin')
+            dump_problems(path, tableaux)
+            with FormulaStore.open(path) as store:
+                self.assertEqual(len(tableaux), store.num_problems)
+                for index in reversed(range(store.num_problems)):
+                    loaded = store.problem(index)
+                    self.assertEqual(tableaux[index].classic_formulae, loaded.classic_formulae)
+                    self.assertEqual(tableaux[index].modal_formulae, loaded.modal_formulae)
+                    self.assertEqual(tableaux[index].assumptions, loaded.assumptions)
+                    self.assertEqual(tableaux[index].solve(), loaded.solve())
+
+    def test_memoryview(self):
+        tableau = ModalTableau(ConjunctiveClause(frozenset({Literal(Atom('p'))})))
+        view = memoryview(bytearray(dumps_problems([tableau])))
+
+        store = FormulaStore(view)
+
+        self.assertEqual(tableau.classic_formulae, store.problem(0).classic_formulae)
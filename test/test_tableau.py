@@ -1,9 +1,16 @@
 # noinspection DuplicatedCode
+import asyncio
+import os
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
+from benchmarks.families import branching
 from cegarpy.atom import Atom
-from cegarpy.formula import Literal, ConjunctiveClause, BoxChain, Implication, Box, Dia, Disjunction
-from cegarpy.tableau import ModalTableau
+from cegarpy.formula import Literal, ConjunctiveClause, BoxChain, Implication, Box, Dia, Disjunction, MutableValuation
+from cegarpy.solver import DpllSolver
+from cegarpy.tableau import ModalTableau, SearchContext
+from cegarpy.worker import WorkerPool, default_pool
+from test.problems import A1, B1, A2, C1, P, Q, EXAMPLE_MODAL_FORMULAE, EXAMPLE_CLOSED
 
 
 class TestInitialize(unittest.TestCase):
@@ -74,3 +81,200 @@ class TestSolve(unittest.TestCase):
         actual = m.solve()
 
         self.assertEqual(expected, actual)
+
+
+class TestIncremental(unittest.TestCase):
+
+    def setUp(self):
+        self.a1, self.b1, self.a2, self.c1, self.p, self.q = A1, B1, A2, C1, P, Q
+        self.modal_formulae = EXAMPLE_MODAL_FORMULAE
+
+    def test_push_pop(self):
+        m = ModalTableau(ConjunctiveClause(frozenset({self.a1, self.c1})), self.modal_formulae)
+
+        self.assertTrue(m.solve())
+        m.push()
+        m.add_classic_formulae({self.a2})
+        self.assertFalse(m.solve())
+        m.pop()
+        self.assertTrue(m.solve())
+        self.assertEqual(ConjunctiveClause(frozenset({self.a1, self.c1})), m.classic_formulae)
+
+    def test_reuses_learned_clauses(self):
+        m = ModalTableau(ConjunctiveClause(frozenset({self.a1, self.a2, self.c1})), self.modal_formulae)
+
+        self.assertFalse(m.solve())
+        assert m.context is not None
+        self.assertTrue(m.context.learned)
+        m.push()
+        m.add_classic_formulae({Disjunction(self.p, self.q)})
+        self.assertFalse(m.solve())
+        assert m.tableau_root is not None
+        self.assertIsNone(m.tableau_root.child)
+        m.pop()
+
+    def test_reuses_subproblems(self):
+        m = ModalTableau(ConjunctiveClause(frozenset({self.a1, self.c1})), self.modal_formulae)
+
+        self.assertTrue(m.solve())
+        m.push()
+        m.add_classic_formulae({self.p})
+        self.assertTrue(m.solve())
+        m.pop()
+        self.assertTrue(m.solve())
+        assert m.context is not None
+        self.assertEqual(2, m.context.statistics.subproblem_hits)
+
+    def test_bounded_caches(self):
+        m = ModalTableau(ConjunctiveClause(frozenset({self.a1, self.c1})), self.modal_formulae,
+                         context=SearchContext(DpllSolver(max_encodings=2), max_subproblems=2, max_learned=1))
+        for classic_formulae in ({self.a2}, {self.p}, {self.q}, {Disjunction(self.a2, self.b1)}):
+            m.push()
+            m.add_classic_formulae(classic_formulae)
+
+            expected = ModalTableau(m.classic_formulae, self.modal_formulae).solve()
+            actual = m.solve()
+
+            self.assertEqual(expected, actual)
+            m.pop()
+        assert m.context is not None and isinstance(m.context.local_solver, DpllSolver)
+        self.assertLessEqual(len(m.context.subproblems), 2)
+        self.assertLessEqual(sum(len(clauses) for clauses in m.context.learned.values()), 1)
+        self.assertLessEqual(len(m.context.local_solver.encodings), 2)
+
+    def test_solve_under_assumptions(self):
+        m = ModalTableau(ConjunctiveClause(frozenset({self.a1, Disjunction(self.a2, self.p)})), self.modal_formulae)
+
+        self.assertTrue(m.solve_under_assumptions(MutableValuation({Atom('c1'): False})))
+        self.assertFalse(m.solve_under_assumptions(MutableValuation({Atom('a2'): True, Atom('c1'): True})))
+        self.assertTrue(m.solve())
+        self.assertEqual([], list(m.scopes))
+
+    def test_matches_fresh(self):
+        variations = [
+            ConjunctiveClause(frozenset({self.a1, self.a2, self.c1})),
+            ConjunctiveClause(frozenset({self.a2, self.c1})),
+            ConjunctiveClause(frozenset({self.a1, self.c1, Disjunction(self.a2, self.b1)})),
+            ConjunctiveClause(frozenset({self.c1, -self.a2})),
+        ]
+        m = ModalTableau(ConjunctiveClause(), self.modal_formulae)
+        for classic_formulae in variations:
+            m.push()
+            m.add_classic_formulae(classic_formulae.formulae)
+
+            expected = ModalTableau(classic_formulae, self.modal_formulae).solve()
+            actual = m.solve()
+
+            self.assertEqual(expected, actual)
+            m.pop()
+
+
+class TestAsync(unittest.TestCase):
+
+    def setUp(self):
+        self.classic_formulae = EXAMPLE_CLOSED
+        self.modal_formulae = EXAMPLE_MODAL_FORMULAE
+
+    def test_yields(self):
+        m = ModalTableau(self.classic_formulae, self.modal_formulae)
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(None)
+                await asyncio.sleep(0)
+
+        async def run():
+            task = asyncio.create_task(ticker())
+            try:
+                return await m.solve_async(steps=1)
+            finally:
+                task.cancel()
+
+        self.assertFalse(asyncio.run(run()))
+        self.assertGreater(len(ticks), 1)
+
+    def test_deadline(self):
+        m = ModalTableau(self.classic_formulae, self.modal_formulae)
+
+        async def run():
+            return await m.solve_async(steps=1, deadline=asyncio.get_running_loop().time())
+
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(run())
+        self.assertFalse(m.solve())
+
+    def test_cancel(self):
+        m = ModalTableau(self.classic_formulae, self.modal_formulae)
+
+        async def run():
+            task = asyncio.create_task(m.solve_async(steps=1))
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            task.cancel()
+            await task
+
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(run())
+        assert m.tableau_root is not None
+        self.assertIsNone(m.tableau_root.status)
+        self.assertFalse(m.solve())
+
+    def test_executor(self):
+        m = ModalTableau(self.classic_formulae, self.modal_formulae)
+
+        with ThreadPoolExecutor(1) as executor:
+            self.assertFalse(asyncio.run(m.solve_in_executor(executor)))
+        self.assertFalse(asyncio.run(m.solve_in_executor()))
+        self.assertIsNone(m.tableau_root)
+
+    def test_worker_is_reused(self):
+        m = ModalTableau(self.classic_formulae, self.modal_formulae)
+        pool = WorkerPool(2)
+
+        async def run():
+            self.assertFalse(await m.solve_in_executor(pool=pool))
+            self.assertFalse(await m.solve_in_executor(pool=pool))
+
+        try:
+            asyncio.run(run())
+            self.assertEqual(1, pool.workers)
+        finally:
+            pool.close()
+        self.assertEqual(os.cpu_count() or 1, default_pool().processes)
+
+    def test_worker_timeout(self):
+        slow = branching(12, True).tableau()
+        m = ModalTableau(self.classic_formulae, self.modal_formulae)
+        pool = WorkerPool(1)
+
+        async def run():
+            queued = asyncio.create_task(m.solve_in_executor(pool=pool))
+            with self.assertRaises(asyncio.TimeoutError):
+                await slow.solve_in_executor(deadline=asyncio.get_running_loop().time() + 0.5, pool=pool)
+            self.assertFalse(await queued)
+
+        try:
+            asyncio.run(run())
+            self.assertEqual(1, pool.workers)
+        finally:
+            pool.close()
+
+    def test_worker_concurrent(self):
+        slow = branching(12, True).tableau()
+        m = ModalTableau(self.classic_formulae, self.modal_formulae)
+        pool = WorkerPool(2)
+
+        async def run():
+            running = asyncio.create_task(slow.solve_in_executor(pool=pool))
+            self.assertFalse(await m.solve_in_executor(pool=pool))
+            self.assertFalse(running.done())
+            running.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await running
+
+        try:
+            asyncio.run(run())
+            self.assertEqual(1, pool.workers)
+        finally:
+            pool.close()
@@ -0,0 +1,99 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from cegarpy.atom import Atom
+from cegarpy.formula import Literal, ConjunctiveClause
+from cegarpy.tableau import ModalTableau
+from cegarpy.trace import Tracer, TraceRecord, LOCAL, JUMP, CLOSE, OPEN, read_trace, read_clause_table, timeline, \
+    folded, main
+from test.problems import EXAMPLE_MODAL_FORMULAE, EXAMPLE_CLOSED, EXAMPLE_OPEN
+
+
+class TestTrace(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'search.trace')
+
+    def test_roundtrip(self):
+        with Tracer(self.path, buffer_records=2) as tracer:
+            tracer.emit(LOCAL, 0)
+            tracer.emit(JUMP, 1)
+            tracer.emit(CLOSE, 1)
+
+        expected = [(LOCAL, 0, 0), (JUMP, 1, 0), (CLOSE, 1, 0)]
+        actual = [(record.event, record.depth, record.clause_id) for record in read_trace(self.path)]
+
+        self.assertListEqual(expected, actual)
+
+    def test_sample(self):
+        with Tracer(self.path, sample=3) as tracer:
+            for _ in range(9):
+                tracer.emit(LOCAL, 0)
+
+        expected = 3
+        actual = len(list(read_trace(self.path)))
+
+        self.assertEqual(expected, actual)
+        self.assertEqual(9, tracer.events)
+
+    def test_clause_table(self):
+        p = Literal(Atom('p'))
+        clauses = ConjunctiveClause(frozenset({p}))
+        with Tracer(self.path) as tracer:
+            tracer.emit(LOCAL, 0, clauses)
+            tracer.emit(LOCAL, 1, ConjunctiveClause(frozenset({p})))
+            tracer.emit(LOCAL, 2, p)
+
+        expected = {1: str(clauses), 2: str(p)}
+        actual = read_clause_table(self.path)
+
+        self.assertDictEqual(expected, actual)
+        self.assertListEqual([1, 1, 2], [record.clause_id for record in read_trace(self.path)])
+
+    def test_rejects_foreign_file(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'\x00' * 32)
+
+        with self.assertRaises(ValueError):
+            list(read_trace(self.path))
+
+    def test_timeline_and_folded(self):
+        records = [TraceRecord(LOCAL, 0, 0, 0), TraceRecord(JUMP, 0, 0, 2000), TraceRecord(OPEN, 1, 0, 5000)]
+
+        self.assertListEqual([0, 1], sorted(timeline(records)))
+        self.assertDictEqual({'depth 0;local': 2, 'depth 0;jump': 3}, folded(records))
+
+    def test_solve(self):
+        with Tracer(self.path) as tracer:
+            m = ModalTableau(EXAMPLE_CLOSED, EXAMPLE_MODAL_FORMULAE)
+            m.initialize()
+            m.tracer = tracer
+            self.assertFalse(m.solve())
+
+        records = list(read_trace(self.path))
+        statistics = m.statistics
+
+        self.assertEqual(len(records), tracer.records)
+        self.assertEqual(statistics.local, sum(record.event == LOCAL for record in records))
+        self.assertEqual(statistics.jump, sum(record.event == JUMP for record in records))
+        self.assertGreater(statistics.close, 0)
+        self.assertEqual(CLOSE, records[-1].event)
+        self.assertEqual(0, records[-1].depth)
+
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            main([self.path, '--folded'])
+        self.assertIn('depth 0;local', stdout.getvalue())
+
+    def test_statistics_without_tracer(self):
+        m = ModalTableau(EXAMPLE_OPEN, EXAMPLE_MODAL_FORMULAE)
+        m.initialize()
+
+        self.assertTrue(m.solve())
+        self.assertGreater(m.statistics.open, 0)
+        self.assertGreater(m.statistics.local, 0)
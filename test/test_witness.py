@@ -0,0 +1,116 @@
+import random
+import subprocess
+import sys
+import unittest
+
+from benchmarks.families import poly
+from cegarpy.atom import Atom
+from cegarpy.kripke import KripkeStructure, extract_witness, validate_witness
+from cegarpy.tableau import ModalTableau, SearchContext
+from cegarpy.witness import WitnessNode
+from test.problems import EXAMPLE_MODAL_FORMULAE, EXAMPLE_CLOSED, EXAMPLE_OPEN, P, random_problem
+
+
+class TestWitnessNode(unittest.TestCase):
+
+    def test_deduplicate(self):
+        p = Atom('p')
+        root = WitnessNode({p: False}, (WitnessNode({p: True}), WitnessNode({p: True})))
+
+        self.assertEqual(3, KripkeStructure.from_witness(root).num_worlds)
+        self.assertEqual(2, KripkeStructure.from_witness(root, deduplicate=True).num_worlds)
+
+    def test_shared(self):
+        p = Atom('p')
+        leaf = WitnessNode({p: True})
+        root = WitnessNode({p: False}, (leaf, leaf))
+
+        expected = [leaf, root]
+        actual = sorted(root, key=lambda node: len(node.successors))
+
+        self.assertListEqual(expected, actual)
+        self.assertEqual(2, KripkeStructure.from_witness(root).num_worlds)
+
+
+class TestTableauWitness(unittest.TestCase):
+
+    def test_closed(self):
+        m = ModalTableau(EXAMPLE_CLOSED, EXAMPLE_MODAL_FORMULAE)
+
+        self.assertFalse(m.solve())
+        self.assertIsNone(m.witness())
+
+    def test_pruned(self):
+        m = ModalTableau(EXAMPLE_OPEN, EXAMPLE_MODAL_FORMULAE, keep_tree=False)
+
+        self.assertTrue(m.solve())
+        assert m.tableau_root is not None
+        self.assertIsNone(m.tableau_root.child)
+        self.assertTrue(validate_witness(m, extract_witness(m)))
+
+    def test_pruned_cache(self):
+        problem = poly(8, True)
+        m = ModalTableau(problem.classic_formulae, problem.modal_formulae, keep_tree=False)
+
+        self.assertTrue(m.solve())
+        assert m.context is not None
+        self.assertTrue(all(status == 'Closed' and witness is None
+                            for status, witness in m.context.subproblems.values()))
+        self.assertGreater(m.statistics.subproblem_hits, 0)
+        self.assertTrue(validate_witness(m, extract_witness(m)))
+
+    def test_bounded_cache(self):
+        problem = poly(8, False)
+        m = ModalTableau(problem.classic_formulae, problem.modal_formulae, keep_tree=False, max_subproblems=8)
+
+        self.assertFalse(m.solve())
+        assert m.context is not None
+        self.assertLessEqual(len(m.context.subproblems), 8)
+
+    def test_optimized(self):
+        script = "from cegarpy.atom import Atom\n" \
+                 "from cegarpy.formula import Literal, ConjunctiveClause, BoxChain, Implication, Dia\n" \
+                 "from cegarpy.kripke import extract_witness, validate_witness\n" \
+                 "from cegarpy.tableau import ModalTableau\n" \
+                 "a, b, p, q = (Literal(Atom(symbol)) for symbol in 'abpq')\n" \
+                 "m = ModalTableau(ConjunctiveClause(frozenset({a, p, -q})),\n" \
+                 "                 BoxChain((ConjunctiveClause(frozenset({Implication(a, Dia(b))})),)))\n" \
+                 "print(m.solve(), validate_witness(m, extract_witness(m)))\n"
+
+        result = subprocess.run([sys.executable, '-O', '-c', script], capture_output=True, text=True, check=True)
+
+        self.assertEqual('True True', result.stdout.strip())
+
+    def test_context_settings(self):
+        context = SearchContext(keep_tree=False, max_subproblems=8)
+
+        m = ModalTableau(EXAMPLE_OPEN, EXAMPLE_MODAL_FORMULAE, context=context)
+
+        self.assertFalse(m.keep_tree)
+        self.assertEqual(8, m.max_subproblems)
+        self.assertIs(context.local_solver, m.local_solver)
+        with self.assertRaises(ValueError):
+            ModalTableau(EXAMPLE_OPEN, EXAMPLE_MODAL_FORMULAE, keep_tree=True, context=context)
+        with self.assertRaises(ValueError):
+            ModalTableau(EXAMPLE_OPEN, EXAMPLE_MODAL_FORMULAE, max_subproblems=16, context=context)
+
+    def test_reused(self):
+        m = ModalTableau(EXAMPLE_OPEN, EXAMPLE_MODAL_FORMULAE)
+
+        self.assertTrue(m.solve())
+        m.push()
+        m.add_classic_formulae({P})
+        self.assertTrue(m.solve())
+        m.pop()
+        self.assertTrue(m.solve())
+        assert m.tableau_root is not None
+        self.assertIsNone(m.tableau_root.child)
+        self.assertTrue(validate_witness(m, extract_witness(m)))
+
+    def test_random(self):
+        rng = random.Random(5)
+        for _ in range(60):
+            classic_formulae, modal_formulae = random_problem(rng, rng.randint(1, 3))
+            m = ModalTableau(classic_formulae, modal_formulae, keep_tree=False)
+            if m.solve():
+                self.assertTrue(validate_witness(m, extract_witness(m, deduplicate=True)))